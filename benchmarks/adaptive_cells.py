@@ -0,0 +1,71 @@
+"""Benchmark Vigil adaptive-layer check latency as memory cells grow.
+
+Loads 10 to 100k synthetic memory cells and reports p50/p95/p99 latency of
+AdaptiveLayer.check() at each size, plus the cost of adding cells one by one
+to an already-large layer. Rebuilds run in a worker thread, so add+check
+pays for the pending substring tests rather than for rebuilding.
+
+    python -m benchmarks.adaptive_cells --sizes 10,1000,100000 --iterations 2000
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+from benchmarks.innate_rules import BENIGN, report
+from romulus.models.actions import AgentAction
+from romulus.vigil.adaptive import AdaptiveLayer
+
+
+def synthetic_target(rng: random.Random) -> str:
+    return "/srv/" + "".join(rng.choices(string.ascii_lowercase + string.digits, k=12))
+
+
+async def measure_checks(layer: AdaptiveLayer, iterations: int) -> list[float]:
+    actions = [
+        AgentAction(action_type="shell", target=t, parameters={"cwd": "/workspace"}) for t in BENIGN
+    ]
+    samples = []
+    for i in range(iterations):
+        act = actions[i % len(actions)]
+        start = time.perf_counter()
+        await layer.check(act)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(sizes: list[int], iterations: int, adds: int):
+    rng = random.Random(7)
+    for size in sizes:
+        layer = AdaptiveLayer(db=None, max_cells=0, max_pattern_chars=0)
+        start = time.perf_counter()
+        for _ in range(size):
+            await layer.add_memory_cell(synthetic_target(rng), "destructive", "Previously blocked")
+        await layer.flush()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        print(f"Adaptive layer, {size} cells (load {load_ms:.0f}ms)")
+        report("check()", await measure_checks(layer, iterations))
+
+        samples = []
+        for _ in range(adds):
+            start = time.perf_counter()
+            await layer.add_memory_cell(synthetic_target(rng), "destructive", "Previously blocked")
+            await layer.check(AgentAction(action_type="shell", target="ls"))
+            samples.append((time.perf_counter() - start) * 1000)
+        report("add+check", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--adds", type=int, default=1000, help="incremental additions measured per size")
+    args = parser.parse_args()
+    asyncio.run(run([int(s) for s in args.sizes.split(",")], args.iterations, args.adds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the Vigil innate matcher against a per-rule regex loop.
+
+Generates a synthetic rule set on top of the built-in innate_rules.yaml and
+reports p50/p95/p99 latency for the single-pass combined matcher and for the
+old one-regex-at-a-time scan over the same texts.
+
+    python -m benchmarks.innate_rules --rules 500 --iterations 5000
+"""
+
+import argparse
+import random
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from romulus.models.actions import AgentAction
+from romulus.vigil.innate import InnateLayer
+
+BUILTIN_RULES = Path(__file__).resolve().parent.parent / "romulus" / "vigil" / "innate_rules.yaml"
+
+BENIGN = [
+    "ls -la /tmp",
+    "git status",
+    "python3 script.py --verbose",
+    "What is the weather like in Lisbon tomorrow?",
+    "Summarize the meeting notes from Monday and list the action items",
+    "calculate 1234 * 5678",
+]
+
+
+def synthetic_rules(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    with open(BUILTIN_RULES) as f:
+        config = yaml.safe_load(f)
+    for i in range(count):
+        if i % 3 == 0:
+            config["scope_violations"].append({
+                "pattern": f"/srv/secret{i}/",
+                "category": "scope_escape",
+                "reason": f"Synthetic scope rule {i}",
+            })
+        else:
+            verb = rng.choice(["purge", "wipe", "nuke", "erase"])
+            config["destructive_patterns"].append({
+                "pattern": f"tool{i}\\s+--{verb}(\\s+-y)?",
+                "category": "destructive",
+                "reason": f"Synthetic destructive rule {i}",
+                "case_insensitive": i % 2 == 0,
+            })
+    return config
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def naive_scan(config: dict):
+    rules = []
+    for entry in config.get("destructive_patterns", []):
+        flags = re.IGNORECASE if entry.get("case_insensitive") else 0
+        rules.append(re.compile(entry["pattern"], flags))
+    for entry in config.get("scope_violations", []):
+        rules.append(re.compile(re.escape(entry["pattern"])))
+
+    def scan(text: str) -> bool:
+        return any(rule.search(text) for rule in rules)
+
+    return scan
+
+
+def measure(fn, texts: list[str], iterations: int) -> list[float]:
+    samples = []
+    for i in range(iterations):
+        text = texts[i % len(texts)]
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    print(
+        f"  {name:<10} p50={percentile(samples, 50):.4f}ms  p95={percentile(samples, 95):.4f}ms  "
+        f"p99={percentile(samples, 99):.4f}ms  mean={statistics.fmean(samples):.4f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=500, help="synthetic rules on top of the built-in set")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    config = synthetic_rules(args.rules)
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump(config, f)
+        rules_path = f.name
+
+    layer = InnateLayer(rules_path=rules_path)
+    texts = [f"{t} {{}}" for t in BENIGN] + [f"tool{args.rules - 1} --wipe {{}}"]
+    total = len(config["destructive_patterns"]) + len(config["scope_violations"])
+
+    print(f"Innate matcher, {total} rules, {args.iterations} iterations")
+    report("combined", measure(layer._rules.matcher.match, texts, args.iterations))
+    report("per-rule", measure(naive_scan(config), texts, args.iterations))
+
+    # End-to-end check() includes loop tracking and verdict construction
+    actions = [AgentAction(action_type="shell", target=t) for t in BENIGN]
+    samples = []
+    for i in range(args.iterations):
+        act = actions[i % len(actions)].model_copy(update={"target": f"{BENIGN[i % len(BENIGN)]} #{i}"})
+        start = time.perf_counter()
+        layer.check(act)
+        samples.append((time.perf_counter() - start) * 1000)
+    report("check()", samples)
+
+    Path(rules_path).unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Soak test for Vigil loop detection memory under many distinct targets.
+
+Feeds InnateLayer's sliding-window counter millions of distinct action keys
+and reports throughput, tracked keys and peak memory, which must stay flat
+once the key cap is reached.
+
+    python -m benchmarks.loop_soak --keys 10000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from romulus.vigil.windows import SlidingWindowCounter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=10_000_000, help="distinct keys to feed")
+    parser.add_argument("--max-keys", type=int, default=10_000)
+    parser.add_argument("--report-every", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    counter = SlidingWindowCounter(max_events=10, window_seconds=60, max_keys=args.max_keys)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(1, args.keys + 1):
+        counter.hit(f"user_request:distinct target number {i}")
+        if i % args.report_every == 0 or i == args.keys:
+            usage = counter.memory_usage()
+            current, peak = tracemalloc.get_traced_memory()
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {i:>11,} keys  {i / elapsed:,.0f}/s  tracked={usage['keys']:,}  "
+                f"evicted={usage['evicted']:,}  approx={usage['approx_bytes'] / 1e6:.1f}MB  "
+                f"traced={current / 1e6:.1f}MB  peak={peak / 1e6:.1f}MB"
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
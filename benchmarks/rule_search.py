@@ -0,0 +1,54 @@
+"""Benchmark RuleIndex.search latency over rules sharing common vocabulary.
+
+Every synthetic rule opens with "When the user asks about ...", so "user" and
+"asks" post to the whole index while each topic term posts to one rule. Reports
+p50/p95/p99 latency of search() for a specific query and for a query made of
+the shared terms alone, which has to score every rule.
+
+    python -m benchmarks.rule_search --sizes 1000,10000 --iterations 2000
+"""
+
+import argparse
+import time
+
+from benchmarks.innate_rules import report
+from romulus.chronicle.rule_index import RuleIndex
+from romulus.models.semantic import SemanticRule
+
+
+def build_index(size: int) -> RuleIndex:
+    index = RuleIndex()
+    for i in range(size):
+        index.add(SemanticRule(
+            rule=f"When the user asks about topic{i}, answer with reference{i % 97} first",
+            confidence=0.5 + (i % 50) / 100,
+        ))
+    return index
+
+
+def measure(index: RuleIndex, queries: list[str], iterations: int) -> list[float]:
+    samples = []
+    for i in range(iterations):
+        query = queries[i % len(queries)]
+        start = time.perf_counter()
+        index.search(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        index = build_index(size)
+        print(f"RuleIndex, {size} rules")
+        specific = [f"the user asks about topic{i} again" for i in range(0, size, max(1, size // 100))]
+        report("specific", measure(index, specific, args.iterations))
+        report("shared", measure(index, ["what does the user ask"], max(1, args.iterations // 10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ from typing import Any, Callable
 
 from romulus.chronicle.episodic import EpisodicStore
 from romulus.chronicle.identity import IdentityStore
+from romulus.chronicle.rule_index import estimate_tokens
 from romulus.chronicle.semantic import SemanticStore
-from romulus.llm.client import OllamaClient
+from romulus.llm.client import LLMResponse, OllamaClient
+from romulus.llm.jsonstream import JSONObjectScanner
 from romulus.llm.prompts import AGENT_SYSTEM_PROMPT
 from romulus.models.actions import ActionOutcome, AgentAction
 from romulus.models.episodic import EpisodicTrace, TaskResult
@@ -27,6 +29,16 @@ class ParsedResponse:
 
 
 class AgentCore:
+    """Runs one task: Vigil check, prompt with learned rules, LLM, tool, trace.
+
+    With stream_responses the reply is streamed and generation is cancelled
+    as soon as the top-level JSON object closes, so the model's trailing
+    chatter is neither waited for nor paid for. Savings are reported per
+    task and totalled in stream_stats().
+    """
+
+    MAX_RESPONSE_TOKENS = 512
+
     def __init__(
         self,
         llm: OllamaClient,
@@ -36,6 +48,10 @@ class AgentCore:
         sentinel: Sentinel,
         tools: dict[str, Callable],
         soul_spec: str = "",
+        max_prompt_rules: int = 10,
+        rule_token_budget: int = 400,
+        agent_id: str = "default",
+        stream_responses: bool = False,
     ):
         self.llm = llm
         self.episodic = episodic_store
@@ -44,6 +60,13 @@ class AgentCore:
         self.sentinel = sentinel
         self.tools = tools
         self.soul_spec = soul_spec
+        self.max_prompt_rules = max_prompt_rules
+        self.rule_token_budget = rule_token_budget
+        self.agent_id = agent_id
+        self.stream_responses = stream_responses
+        self.early_stops = 0
+        self.tokens_saved = 0
+        self.latency_saved_ms = 0
 
     async def handle_task(self, task: str, context: dict = None) -> TaskResult:
         if context is None:
@@ -57,7 +80,7 @@ class AgentCore:
             )
 
         # Check if the task itself contains destructive content
-        vigil_action = AgentAction(action_type="user_request", target=task)
+        vigil_action = AgentAction(action_type="user_request", target=task, agent_id=self.agent_id)
         vigil_check = await self.sentinel.evaluate(vigil_action)
         if not vigil_check.approved:
             elapsed_ms = int((time.monotonic() - start_time) * 1000)
@@ -75,10 +98,12 @@ class AgentCore:
                 tokens_used=0, latency_ms=elapsed_ms,
             )
 
-        rules = await self.semantic.get_all_rules()
+        rules = await self.semantic.select_rules(
+            task, limit=self.max_prompt_rules, token_budget=self.rule_token_budget,
+        )
         rules_text = "\n".join(
             [f"- {r.rule} (confidence: {r.confidence:.0%})" for r in rules]
-        ) if rules else "None yet — still learning from experience."
+        ) if rules else "None relevant yet — still learning from experience."
 
         identity = await self.identity.get_identity()
         tool_descriptions = ", ".join(self.tools.keys()) if self.tools else "none"
@@ -99,20 +124,30 @@ class AgentCore:
         ]
 
         try:
-            llm_response = await self.llm.chat(messages, max_tokens=512)
+            if self.stream_responses:
+                llm_response = await self._chat_until_object(messages, self.MAX_RESPONSE_TOKENS)
+            else:
+                llm_response = await self.llm.chat(messages, max_tokens=self.MAX_RESPONSE_TOKENS)
         except Exception as e:
             elapsed_ms = int((time.monotonic() - start_time) * 1000)
             return TaskResult(
                 task=task, success=False, confidence=0.0,
                 response=f"LLM error: {e}", tokens_used=0, latency_ms=elapsed_ms,
             )
+        self.sentinel.record_tokens(self.agent_id, llm_response.tokens_used)
 
         parsed = self._parse_response(llm_response.text)
+        anomalies = await self.sentinel.observe_response(
+            self.agent_id, parsed.action or "respond", parsed.confidence,
+            llm_response.latency_ms, llm_response.tokens_used,
+            known=not parsed.action or parsed.action == "respond" or parsed.action in self.tools,
+        )
 
         action_outcome = None
         if parsed.action and parsed.action != "respond" and parsed.action in self.tools:
             action = AgentAction(
                 action_type="tool_call", target=parsed.action, parameters=parsed.params,
+                agent_id=self.agent_id,
             )
             verdict = await self.sentinel.evaluate(action)
             if verdict.approved:
@@ -143,7 +178,7 @@ class AgentCore:
         success = bool(parsed.response or (action_outcome and action_outcome.executed))
         elapsed_ms = int((time.monotonic() - start_time) * 1000)
 
-        vigil_flags = []
+        vigil_flags = [flag.reason for flag in anomalies]
         if action_outcome and not action_outcome.verdict.approved:
             vigil_flags.append(action_outcome.verdict.reason)
 
@@ -151,6 +186,7 @@ class AgentCore:
             task=task, success=success, confidence=parsed.confidence,
             response=response_text, vigil_flags=vigil_flags,
             tokens_used=llm_response.tokens_used, latency_ms=elapsed_ms,
+            tokens_saved=llm_response.tokens_saved, latency_saved_ms=llm_response.latency_saved_ms,
         )
 
         trace = EpisodicTrace(
@@ -166,6 +202,77 @@ class AgentCore:
 
         return result
 
+    async def _chat_until_object(self, messages: list[dict], max_tokens: int) -> LLMResponse:
+        """Stream the reply, closing the stream once its JSON object is complete.
+
+        Closing the stream makes Ollama stop generating. A cut stream has no
+        usage record, so completion tokens are counted one per streamed delta
+        and prompt tokens are estimated from the messages. tokens_saved is
+        the unspent part of max_tokens and latency_saved_ms the time it
+        would have taken at the observed rate; both are upper bounds, since
+        the model might have stopped on its own sooner. A reply whose first
+        object is not valid JSON is streamed to the end as usual.
+        """
+        start = time.monotonic()
+        scanner = JSONObjectScanner()
+        scanning = True
+        first_token_at = None
+        deltas = 0
+        obj = None
+        stream = self.llm.chat_stream(messages, max_tokens=max_tokens)
+        try:
+            async for chunk in stream:
+                if chunk.done:
+                    return chunk.response
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                deltas += 1
+                if scanning:
+                    obj = scanner.feed(chunk.text)
+                    if obj is not None:
+                        if self._is_json_object(obj):
+                            break
+                        scanning = False
+        finally:
+            await stream.aclose()
+        if obj is None or not scanning:
+            raise RuntimeError("LLM stream ended without a final record")
+
+        now = time.monotonic()
+        generating = now - first_token_at
+        rate = deltas / generating if generating > 0 else 0.0
+        tokens_saved = max(0, max_tokens - deltas)
+        self.early_stops += 1
+        self.tokens_saved += tokens_saved
+        latency_saved_ms = int(tokens_saved / rate * 1000) if rate else 0
+        self.latency_saved_ms += latency_saved_ms
+        return LLMResponse(
+            text=obj,
+            tokens_used=sum(estimate_tokens(m["content"]) for m in messages) + deltas,
+            latency_ms=int((now - start) * 1000),
+            model=self.llm.model,
+            ttft_ms=int((first_token_at - start) * 1000),
+            tokens_per_second=round(rate, 1) if rate else None,
+            stopped_early=True,
+            tokens_saved=tokens_saved,
+            latency_saved_ms=latency_saved_ms,
+        )
+
+    @staticmethod
+    def _is_json_object(text: str) -> bool:
+        try:
+            return isinstance(json.loads(text), dict)
+        except json.JSONDecodeError:
+            return False
+
+    def stream_stats(self) -> dict:
+        return {
+            "enabled": self.stream_responses,
+            "early_stops": self.early_stops,
+            "tokens_saved": self.tokens_saved,
+            "latency_saved_ms": self.latency_saved_ms,
+        }
+
     def _parse_response(self, text: str) -> ParsedResponse:
         json_match = re.search(r"```(?:json)?\s*([\s\S]*?)```", text)
         json_text = json_match.group(1).strip() if json_match else text.strip()
@@ -1,5 +1,7 @@
 import json
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator
 
 import aiosqlite
 
@@ -63,13 +65,58 @@ CREATE TABLE IF NOT EXISTS vigil_incidents (
     category TEXT NOT NULL,
     layer TEXT NOT NULL,
     reason TEXT NOT NULL,
-    blocked INTEGER NOT NULL
+    blocked INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1,
+    last_seen TEXT,
+    fingerprint TEXT
+);
+
+CREATE TABLE IF NOT EXISTS vigil_memory_cells (
+    pattern TEXT NOT NULL,
+    category TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    hit_count INTEGER DEFAULT 1,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
 );
 
 CREATE INDEX IF NOT EXISTS idx_traces_timestamp ON episodic_traces(timestamp);
 CREATE INDEX IF NOT EXISTS idx_traces_success ON episodic_traces(success);
 CREATE INDEX IF NOT EXISTS idx_rules_domain ON semantic_rules(domain);
 CREATE INDEX IF NOT EXISTS idx_vigil_timestamp ON vigil_incidents(timestamp);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_memory_cells_pattern ON vigil_memory_cells(pattern, category);
+"""
+
+# Columns added to vigil_incidents after its first release, so that identical
+# incidents in one time bucket aggregate into a single counted row
+INCIDENT_AGGREGATE_COLUMNS = {
+    "count": "INTEGER NOT NULL DEFAULT 1",
+    "last_seen": "TEXT",
+    "fingerprint": "TEXT",
+}
+
+INCIDENT_AGGREGATE_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_vigil_fingerprint ON vigil_incidents(fingerprint)"
+)
+
+# Recency queries go by an aggregated row's latest event, not its first
+INCIDENT_LAST_SEEN_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_vigil_last_seen ON vigil_incidents(COALESCE(last_seen, timestamp))"
+)
+
+# Databases created before vigil_memory_cells existed get it filled once from
+# their incident history, following adaptive.is_learnable(): loop, rate-limit
+# and judge-outage blocks never become cells, adaptive blocks are hits on
+# cells that already exist, judge blocks of tool calls name only the tool, and
+# targets outside the length limits are skipped.
+BACKFILL_MEMORY_CELLS = """
+INSERT OR IGNORE INTO vigil_memory_cells (pattern, category, reason, hit_count, first_seen, last_seen)
+SELECT target, category, MIN(reason), SUM(count), MIN(timestamp), MAX(COALESCE(last_seen, timestamp))
+FROM vigil_incidents
+WHERE blocked = 1 AND category NOT IN ('looping', 'cost_runaway', 'unverified') AND layer != 'adaptive'
+  AND length(target) BETWEEN 1 AND 256
+  AND (layer != 'judge' OR (action_type != 'tool_call' AND category = 'destructive' AND length(target) >= 8))
+GROUP BY target, category
 """
 
 
@@ -81,14 +128,46 @@ class ChronicleDB:
         if self.db_path != ":memory:":
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vigil_memory_cells'"
+            )
+            has_memory_cells = await cursor.fetchone() is not None
             await db.executescript(SCHEMA)
+            await self._migrate_incidents(db)
+            if not has_memory_cells:
+                await db.execute(BACKFILL_MEMORY_CELLS)
             await db.commit()
 
+    @staticmethod
+    async def _migrate_incidents(db: aiosqlite.Connection):
+        cursor = await db.execute("PRAGMA table_info(vigil_incidents)")
+        existing = {row[1] for row in await cursor.fetchall()}
+        for column, definition in INCIDENT_AGGREGATE_COLUMNS.items():
+            if column not in existing:
+                await db.execute(f"ALTER TABLE vigil_incidents ADD COLUMN {column} {definition}")
+        if "last_seen" not in existing:
+            # Rows from before aggregation each stand for a single event
+            await db.execute("UPDATE vigil_incidents SET last_seen = timestamp")
+        await db.execute(INCIDENT_AGGREGATE_INDEX)
+        await db.execute(INCIDENT_LAST_SEEN_INDEX)
+
     async def connect(self) -> aiosqlite.Connection:
         db = await aiosqlite.connect(self.db_path)
         db.row_factory = aiosqlite.Row
         return db
 
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run several statements on one connection and commit them together."""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            await db.commit()
+
     async def execute(self, query: str, params: tuple = ()) -> list[dict]:
         async with aiosqlite.connect(self.db_path) as db:
             db.row_factory = aiosqlite.Row
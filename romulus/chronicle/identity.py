@@ -5,14 +5,30 @@ from romulus.chronicle.database import ChronicleDB
 from romulus.models.identity import AgentIdentity
 
 
+def trust_score(total_tasks: int, successful_tasks: int) -> float:
+    """Success rate pulled towards 0.5 until there are 50 tasks of evidence."""
+    if total_tasks <= 0:
+        return 0.5
+    trust = successful_tasks / total_tasks
+    trust = 0.5 + (trust - 0.5) * min(total_tasks / 50, 1.0)
+    return round(trust, 4)
+
+
 class IdentityStore:
+    """Agent identity, cached in memory after the first read.
+
+    Reads are served from the cache; each stats update is a single atomic
+    UPDATE that recomputes trust in SQL, mirrored onto the cached copy.
+    """
+
     def __init__(self, db: ChronicleDB):
         self.db = db
+        self._identity: AgentIdentity | None = None
 
     async def get_or_create_identity(self, name: str, soul_spec: str = "") -> AgentIdentity:
-        rows = await self.db.execute("SELECT * FROM agent_identity LIMIT 1")
-        if rows:
-            return self._row_to_identity(rows[0])
+        existing = await self.get_identity()
+        if existing is not None:
+            return existing
 
         identity = AgentIdentity(
             id=str(uuid4()),
@@ -37,35 +53,35 @@ class IdentityStore:
                 identity.total_uptime_seconds,
             ),
         )
-        return identity
+        self._identity = identity
+        return identity.model_copy()
 
     async def get_identity(self) -> AgentIdentity | None:
-        rows = await self.db.execute("SELECT * FROM agent_identity LIMIT 1")
-        if not rows:
-            return None
-        return self._row_to_identity(rows[0])
+        if self._identity is None:
+            rows = await self.db.execute("SELECT * FROM agent_identity LIMIT 1")
+            if not rows:
+                return None
+            self._identity = self._row_to_identity(rows[0])
+        return self._identity.model_copy()
 
     async def update_stats(self, task_success: bool):
-        if task_success:
-            await self.db.execute(
-                "UPDATE agent_identity SET total_tasks = total_tasks + 1, successful_tasks = successful_tasks + 1"
-            )
-        else:
-            await self.db.execute(
-                "UPDATE agent_identity SET total_tasks = total_tasks + 1"
-            )
-        await self._recalculate_trust()
-
-    async def _recalculate_trust(self):
-        rows = await self.db.execute(
-            "SELECT total_tasks, successful_tasks FROM agent_identity LIMIT 1"
+        success = int(task_success)
+        # Counters and trust in one statement; SET expressions all see the pre-update row
+        await self.db.execute(
+            """UPDATE agent_identity
+               SET total_tasks = total_tasks + 1,
+                   successful_tasks = successful_tasks + ?,
+                   trust_score = ROUND(
+                       0.5 + ((successful_tasks + ?) * 1.0 / (total_tasks + 1) - 0.5)
+                             * MIN((total_tasks + 1) / 50.0, 1.0),
+                       4)""",
+            (success, success),
         )
-        if rows and rows[0]["total_tasks"] > 0:
-            trust = rows[0]["successful_tasks"] / rows[0]["total_tasks"]
-            trust = 0.5 + (trust - 0.5) * min(rows[0]["total_tasks"] / 50, 1.0)
-            await self.db.execute(
-                "UPDATE agent_identity SET trust_score = ?", (round(trust, 4),)
-            )
+        if self._identity is not None:
+            identity = self._identity
+            identity.total_tasks += 1
+            identity.successful_tasks += success
+            identity.trust_score = trust_score(identity.total_tasks, identity.successful_tasks)
 
     def _row_to_identity(self, row: dict) -> AgentIdentity:
         return AgentIdentity(
@@ -0,0 +1,270 @@
+import hashlib
+import heapq
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from romulus.models.semantic import SemanticRule
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "because", "by", "do", "does", "for", "from",
+    "has", "have", "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or",
+    "should", "so", "than", "that", "the", "then", "there", "this", "to", "use", "was", "what",
+    "when", "which", "while", "who", "will", "with", "you", "your",
+})
+
+# Terms that set what a rule asks for rather than what it is about. Two rules
+# differing in these say different things however many other terms they share
+# ("t" is what's left of "don't", "can't" and the like after tokenizing)
+POLARITY_TERMS = frozenset({
+    "always", "avoid", "cannot", "don", "dont", "except", "never", "no", "nor", "not", "only", "t",
+    "unless",
+})
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def normalized_hash(text: str) -> str:
+    """Hash of a rule's text with case, punctuation and whitespace normalized away."""
+    return hashlib.sha1(" ".join(_TOKEN_RE.findall(text.lower())).encode()).hexdigest()
+
+
+def decayed_confidence(rule: SemanticRule, half_life_days: float, now: datetime | None = None) -> float:
+    """Confidence halved for every half-life elapsed since the rule was last validated."""
+    if half_life_days <= 0:
+        return rule.confidence
+    age_days = max(0.0, ((now or datetime.utcnow()) - rule.last_validated).total_seconds() / 86400)
+    return rule.confidence * 0.5 ** (age_days / half_life_days)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting prompts
+    return len(text) // 4 + 1
+
+
+class RuleIndex:
+    """In-memory BM25 inverted index over semantic rules.
+
+    Kept in sync by SemanticStore on every mutation, so selecting rules for a
+    prompt never touches SQLite. A mutation only touches the rule's own
+    postings and the document-length total; BM25 weights are computed at
+    query time from those, so nothing is rebuilt when the corpus changes.
+    Confidence is kept apart from the postings as one decay key per rule,
+    so a change of confidence or validation time is a single assignment.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        domain_boost: float = 1.5,
+        half_life_days: float = 0.0,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.domain_boost = domain_boost
+        self.half_life_days = half_life_days
+        self._rules: dict[str, SemanticRule] = {}
+        self._doc_terms: dict[str, Counter] = {}
+        self._doc_len: dict[str, int] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._domains: dict[str, set[str]] = {}
+        self._hashes: dict[tuple[str, str], str] = {}
+        self._total_len = 0
+        # log2(confidence) + last validation in half-lives: the decayed confidence
+        # at time t is then 2 ** (key - t / half_life), one power per scored rule
+        self._decay: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._rules
+
+    def get(self, rule_id: str) -> SemanticRule | None:
+        return self._rules.get(rule_id)
+
+    def rules(self) -> list[SemanticRule]:
+        return list(self._rules.values())
+
+    def add(self, rule: SemanticRule):
+        if rule.id in self._rules:
+            self.remove(rule.id)
+
+        terms = Counter(tokenize(rule.rule))
+        self._rules[rule.id] = rule
+        self._decay[rule.id] = self._decay_key(rule)
+        self._doc_terms[rule.id] = terms
+        self._doc_len[rule.id] = sum(terms.values())
+        self._total_len += self._doc_len[rule.id]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[rule.id] = tf
+        self._domains.setdefault(rule.domain, set()).add(rule.id)
+        self._hashes.setdefault((rule.domain, normalized_hash(rule.rule)), rule.id)
+
+    def update(self, rule: SemanticRule):
+        """Replace a rule's metadata, reindexing only if its text or domain changed."""
+        current = self._rules.get(rule.id)
+        if current is None or current.rule != rule.rule or current.domain != rule.domain:
+            self.add(rule)
+            return
+        self._rules[rule.id] = rule
+        self._decay[rule.id] = self._decay_key(rule)
+
+    def remove(self, rule_id: str):
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return
+        del self._decay[rule_id]
+
+        domain_ids = self._domains[rule.domain]
+        domain_ids.discard(rule_id)
+        if not domain_ids:
+            del self._domains[rule.domain]
+        hash_key = (rule.domain, normalized_hash(rule.rule))
+        if self._hashes.get(hash_key) == rule_id:
+            del self._hashes[hash_key]
+
+        terms = self._doc_terms.pop(rule_id)
+        self._total_len -= self._doc_len.pop(rule_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[rule_id]
+            if not postings:
+                del self._postings[term]
+
+    def find_duplicate(self, rule: SemanticRule, threshold: float = 0.8) -> SemanticRule | None:
+        """Find an indexed rule in the same domain that says the same thing.
+
+        An identical normalized text is a duplicate outright; otherwise the rule
+        with the same POLARITY_TERMS and the highest term-set Jaccard similarity
+        at or above the threshold is returned, so "never X" doesn't swallow "X".
+        Prefix filtering keeps this sublinear in the rule count: a candidate
+        reaching the threshold must share one of the query's rarest terms, so
+        only those postings are visited.
+        """
+        existing_id = self._hashes.get((rule.domain, normalized_hash(rule.rule)))
+        if existing_id is not None:
+            return self._rules[existing_id]
+
+        terms = set(tokenize(rule.rule))
+        domain_ids = self._domains.get(rule.domain)
+        if not terms or not domain_ids:
+            return None
+
+        by_rarity = sorted(terms, key=lambda t: len(self._postings.get(t, ())))
+        prefix = by_rarity[:len(terms) - math.ceil(threshold * len(terms)) + 1]
+
+        polarity = terms & POLARITY_TERMS
+        best: SemanticRule | None = None
+        best_score = threshold
+        seen: set[str] = set()
+        for term in prefix:
+            for rule_id in self._postings.get(term, ()):
+                if rule_id in seen or rule_id not in domain_ids:
+                    continue
+                seen.add(rule_id)
+                other = self._doc_terms[rule_id].keys()
+                if polarity != POLARITY_TERMS.intersection(other):
+                    continue
+                overlap = len(terms.intersection(other))
+                score = overlap / (len(terms) + len(other) - overlap)
+                if score >= best_score:
+                    best, best_score = self._rules[rule_id], score
+        return best
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        token_budget: int | None = None,
+    ) -> list[SemanticRule]:
+        """Return the top rules for a query, ranked by BM25 x confidence.
+
+        Confidence is decayed by time since last validation. Rules whose domain
+        is mentioned in the query are boosted. Rules matching only terms found
+        in over half the index are left out when a rarer term matches. When a
+        token budget is given, rules are taken in rank order while they still fit.
+        """
+        if not self._rules or limit <= 0:
+            return []
+
+        query_terms = set(tokenize(query))
+        n_docs = len(self._rules)
+        avg_len = self._total_len / n_docs or 1.0
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)), with the constants hoisted
+        norm_base = self.k1 * (1 - self.b)
+        norm_len = self.k1 * self.b / avg_len
+        doc_len = self._doc_len
+        scores: dict[str, float] = {}
+        get_score = scores.get
+
+        # Terms in over half the rules ("user", "asks") weigh under (k1 + 1) * log 2
+        # and say little about which rule is meant, yet their postings are most
+        # of the work. They only add to rules a rarer term already reached, and
+        # pick rules themselves only when no rarer term matches anything.
+        common: list[tuple[float, dict[str, int]]] = []
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+            if 2 * df > n_docs:
+                common.append((idf, postings))
+                continue
+            for rule_id, tf in postings.items():
+                scores[rule_id] = get_score(rule_id, 0.0) + idf * tf / (tf + norm_base + norm_len * doc_len[rule_id])
+
+        reached = list(scores)
+        for idf, postings in common:
+            matched = [(rule_id, postings[rule_id]) for rule_id in reached if rule_id in postings] if reached \
+                else postings.items()
+            for rule_id, tf in matched:
+                scores[rule_id] = get_score(rule_id, 0.0) + idf * tf / (tf + norm_base + norm_len * doc_len[rule_id])
+
+        if not scores:
+            return []
+
+        decay = self._decay
+        if self.half_life_days > 0:
+            now = time.time() / (self.half_life_days * 86400)
+            for rule_id in scores:
+                scores[rule_id] *= 2 ** (decay[rule_id] - now)
+        else:
+            for rule_id in scores:
+                scores[rule_id] *= 2 ** decay[rule_id]
+        for domain in query_terms.intersection(self._domains):
+            for rule_id in self._domains[domain].intersection(scores):
+                scores[rule_id] *= self.domain_boost
+
+        # Over-fetch so rules skipped for the token budget can be backfilled
+        fetch = limit * 3 if token_budget is not None else limit
+        candidates = heapq.nlargest(fetch, scores, key=scores.__getitem__)
+
+        selected: list[SemanticRule] = []
+        spent = 0
+        for rule_id in candidates:
+            rule = self._rules[rule_id]
+            if token_budget is not None:
+                cost = estimate_tokens(rule.rule)
+                if spent + cost > token_budget:
+                    continue
+                spent += cost
+            selected.append(rule)
+            if len(selected) >= limit:
+                break
+        return selected
+
+    def _decay_key(self, rule: SemanticRule) -> float:
+        key = math.log2(rule.confidence) if rule.confidence > 0 else -math.inf
+        if self.half_life_days > 0:
+            validated = rule.last_validated.replace(tzinfo=timezone.utc).timestamp()
+            key += validated / (self.half_life_days * 86400)
+        return key
@@ -2,31 +2,101 @@ import json
 from datetime import datetime
 
 from romulus.chronicle.database import ChronicleDB
+from romulus.chronicle.rule_index import RuleIndex, decayed_confidence
 from romulus.models.semantic import SemanticRule
 
 
 class SemanticStore:
-    def __init__(self, db: ChronicleDB):
+    def __init__(
+        self,
+        db: ChronicleDB,
+        duplicate_threshold: float = 0.8,
+        half_life_days: float = 30.0,
+        max_rules_per_domain: int = 200,
+    ):
         self.db = db
+        self.duplicate_threshold = duplicate_threshold
+        self.half_life_days = half_life_days
+        self.max_rules_per_domain = max_rules_per_domain
+        self._index: RuleIndex | None = None
 
     async def add_rule(self, rule: SemanticRule) -> str:
-        await self.db.execute_insert(
-            """INSERT INTO semantic_rules
-               (id, rule, confidence, evidence_count, last_validated,
-                contradictions, domain, source_episode_ids)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                rule.id,
-                rule.rule,
-                rule.confidence,
-                rule.evidence_count,
-                rule.last_validated.isoformat(),
-                rule.contradictions,
-                rule.domain,
-                json.dumps(rule.source_episode_ids),
-            ),
-        )
-        return rule.id
+        """Insert a rule, or merge it into an existing near-duplicate.
+
+        Returns the id of the stored rule, which is the existing rule's id when
+        the new one was merged into it.
+        """
+        return (await self.add_rules([rule]))[0]
+
+    async def add_rules(self, rules: list[SemanticRule]) -> list[str]:
+        """Insert or merge a batch of rules in a single transaction.
+
+        Returns the stored id for each input rule, in order. Duplicates are
+        resolved against existing rules and against earlier rules in the batch.
+        """
+        if not rules:
+            return []
+
+        index = await self._get_index()
+        inserted: dict[str, SemanticRule] = {}
+        merged: dict[str, SemanticRule] = {}
+        stored_ids = []
+        try:
+            for rule in rules:
+                duplicate = index.find_duplicate(rule, threshold=self.duplicate_threshold)
+                if duplicate is None:
+                    index.add(rule)
+                    inserted[rule.id] = rule
+                    stored_ids.append(rule.id)
+                    continue
+                updated = self._merge(duplicate, rule)
+                index.update(updated)
+                if updated.id in inserted:
+                    inserted[updated.id] = updated
+                else:
+                    merged[updated.id] = updated
+                stored_ids.append(updated.id)
+
+            async with self.db.transaction() as conn:
+                await conn.executemany(
+                    """INSERT INTO semantic_rules
+                       (id, rule, confidence, evidence_count, last_validated,
+                        contradictions, domain, source_episode_ids)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (
+                            r.id,
+                            r.rule,
+                            r.confidence,
+                            r.evidence_count,
+                            r.last_validated.isoformat(),
+                            r.contradictions,
+                            r.domain,
+                            json.dumps(r.source_episode_ids),
+                        )
+                        for r in inserted.values()
+                    ],
+                )
+                await conn.executemany(
+                    """UPDATE semantic_rules
+                       SET confidence = ?, evidence_count = ?, last_validated = ?, source_episode_ids = ?
+                       WHERE id = ?""",
+                    [
+                        (
+                            r.confidence,
+                            r.evidence_count,
+                            r.last_validated.isoformat(),
+                            json.dumps(r.source_episode_ids),
+                            r.id,
+                        )
+                        for r in merged.values()
+                    ],
+                )
+        except BaseException:
+            # The index was updated optimistically; rebuild it from the database next time
+            self._index = None
+            raise
+        return stored_ids
 
     async def get_all_rules(self, domain: str | None = None) -> list[SemanticRule]:
         if domain:
@@ -48,32 +118,136 @@ class SemanticStore:
             return None
         return self._row_to_rule(rows[0])
 
+    async def select_rules(self, query: str, limit: int = 10, token_budget: int | None = None) -> list[SemanticRule]:
+        """Return the rules most relevant to a task, served from the in-memory index.
+
+        Returned rules carry their effective (decayed) confidence.
+        """
+        index = await self._get_index()
+        now = datetime.utcnow()
+        return [
+            rule.model_copy(update={"confidence": self.effective_confidence(rule, now)})
+            for rule in index.search(query, limit=limit, token_budget=token_budget)
+        ]
+
+    def effective_confidence(self, rule: SemanticRule, now: datetime | None = None) -> float:
+        return decayed_confidence(rule, self.half_life_days, now)
+
+    async def evict_rules(self) -> list[str]:
+        """Enforce max_rules_per_domain, deleting the lowest effective-confidence rules.
+
+        Runs as one batched maintenance pass (one DELETE) and returns the
+        evicted rule ids.
+        """
+        index = await self._get_index()
+        now = datetime.utcnow()
+        by_domain: dict[str, list[SemanticRule]] = {}
+        for rule in index.rules():
+            by_domain.setdefault(rule.domain, []).append(rule)
+
+        evicted: list[str] = []
+        for rules in by_domain.values():
+            excess = len(rules) - self.max_rules_per_domain
+            if excess > 0:
+                rules.sort(key=lambda r: self.effective_confidence(r, now))
+                evicted.extend(r.id for r in rules[:excess])
+
+        if evicted:
+            async with self.db.transaction() as conn:
+                await conn.execute(
+                    "DELETE FROM semantic_rules WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(evicted),),
+                )
+            for rule_id in evicted:
+                index.remove(rule_id)
+        return evicted
+
     async def validate_rule(self, rule_id: str):
-        await self.db.execute(
-            """UPDATE semantic_rules
-               SET evidence_count = evidence_count + 1, last_validated = ?
-               WHERE id = ?""",
-            (datetime.utcnow().isoformat(), rule_id),
-        )
+        await self.validate_rules([rule_id])
+
+    async def validate_rules(self, rule_ids: list[str]):
+        """Record one more piece of supporting evidence for each rule, in one statement."""
+        if not rule_ids:
+            return
+        now = datetime.utcnow()
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                """UPDATE semantic_rules
+                   SET evidence_count = evidence_count + 1, last_validated = ?
+                   WHERE id IN (SELECT value FROM json_each(?))""",
+                (now.isoformat(), json.dumps(rule_ids)),
+            )
+
+        if self._index is not None:
+            for rule_id in set(rule_ids):
+                cached = self._index.get(rule_id)
+                if cached is not None:
+                    self._index.update(cached.model_copy(update={
+                        "evidence_count": cached.evidence_count + 1,
+                        "last_validated": now,
+                    }))
 
     async def invalidate_rule(self, rule_id: str):
-        await self.db.execute(
-            "UPDATE semantic_rules SET contradictions = contradictions + 1 WHERE id = ?",
-            (rule_id,),
-        )
-        rows = await self.db.execute(
-            "SELECT evidence_count, contradictions FROM semantic_rules WHERE id = ?",
-            (rule_id,),
-        )
-        if rows and rows[0]["contradictions"] > rows[0]["evidence_count"]:
-            await self.db.execute(
-                "DELETE FROM semantic_rules WHERE id = ?", (rule_id,)
+        await self.invalidate_rules([rule_id])
+
+    async def invalidate_rules(self, rule_ids: list[str]) -> list[str]:
+        """Record a contradiction against each rule in one transaction.
+
+        Rules whose contradictions now exceed their evidence are deleted; their
+        ids are returned.
+        """
+        if not rule_ids:
+            return []
+        ids_json = json.dumps(rule_ids)
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                """UPDATE semantic_rules SET contradictions = contradictions + 1
+                   WHERE id IN (SELECT value FROM json_each(?))""",
+                (ids_json,),
+            )
+            # No DELETE ... RETURNING: it needs SQLite 3.35, newer than some Pi OS releases ship
+            cursor = await conn.execute(
+                """SELECT id FROM semantic_rules
+                   WHERE id IN (SELECT value FROM json_each(?)) AND contradictions > evidence_count""",
+                (ids_json,),
             )
+            deleted = [row["id"] for row in await cursor.fetchall()]
+            if deleted:
+                await conn.execute(
+                    "DELETE FROM semantic_rules WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(deleted),),
+                )
+
+        if self._index is not None:
+            for rule_id in deleted:
+                self._index.remove(rule_id)
+            for rule_id in set(rule_ids).difference(deleted):
+                cached = self._index.get(rule_id)
+                if cached is not None:
+                    self._index.update(cached.model_copy(update={"contradictions": cached.contradictions + 1}))
+        return deleted
 
     async def count_rules(self) -> int:
         rows = await self.db.execute("SELECT COUNT(*) as cnt FROM semantic_rules")
         return rows[0]["cnt"] if rows else 0
 
+    def _merge(self, existing: SemanticRule, incoming: SemanticRule) -> SemanticRule:
+        episode_ids = list(dict.fromkeys(existing.source_episode_ids + incoming.source_episode_ids))
+        return existing.model_copy(update={
+            "confidence": max(existing.confidence, incoming.confidence),
+            "evidence_count": existing.evidence_count + incoming.evidence_count,
+            "last_validated": datetime.utcnow(),
+            "source_episode_ids": episode_ids,
+        })
+
+    async def _get_index(self) -> RuleIndex:
+        if self._index is None:
+            index = RuleIndex(half_life_days=self.half_life_days)
+            for rule in await self.get_all_rules():
+                index.add(rule)
+            self._index = index
+        return self._index
+
     def _row_to_rule(self, row: dict) -> SemanticRule:
         return SemanticRule(
             id=row["id"],
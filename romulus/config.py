@@ -11,6 +11,17 @@ class OllamaConfig(BaseModel):
     max_tokens: int = 512
 
 
+class ChronicleConfig(BaseModel):
+    rule_half_life_days: float = 30.0
+    max_rules_per_domain: int = 200
+
+
+class AgentConfig(BaseModel):
+    max_prompt_rules: int = 10
+    rule_token_budget: int = 400
+    stream_responses: bool = False
+
+
 class DreamConfig(BaseModel):
     enabled: bool = True
     schedule_cron: str = "0 3 * * *"
@@ -22,7 +33,27 @@ class DreamConfig(BaseModel):
 class VigilConfig(BaseModel):
     enabled: bool = True
     innate_rules_path: str | None = None
+    rules_cache_enabled: bool = True
     max_actions_per_minute: int = 30
+    max_tokens_per_minute: int = 10000
+    verdict_cache_size: int = 4096
+    rules_reload_interval_seconds: float = 5.0
+    incident_queue_size: int = 10000
+    incident_bucket_minutes: int = 60
+    max_memory_cells: int = 10000
+    max_memory_cell_chars: int = 500000
+    memory_cell_half_life_hours: float = 168.0
+    judge_enabled: bool = True
+    judge_action_types: list[str] = ["shell", "tool_call"]
+    judge_timeout_seconds: float = 2.0
+    judge_fail_closed: bool = False
+    judge_max_concurrent: int = 2
+    judge_cache_size: int = 1024
+    max_scan_chars: int = 262144
+    anomaly_enabled: bool = True
+    anomaly_alpha: float = 0.1
+    anomaly_threshold: float = 3.0
+    anomaly_warmup: int = 20
 
 
 class ArenaConfig(BaseModel):
@@ -42,6 +73,8 @@ class RomulusConfig(BaseModel):
     data_dir: str = "data"
     soul_path: str = "soul.md"
     ollama: OllamaConfig = OllamaConfig()
+    chronicle: ChronicleConfig = ChronicleConfig()
+    agent: AgentConfig = AgentConfig()
     dream: DreamConfig = DreamConfig()
     vigil: VigilConfig = VigilConfig()
     arena: ArenaConfig = ArenaConfig()
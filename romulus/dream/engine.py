@@ -42,17 +42,21 @@ class DreamEngine:
 
         replay_summary = await self.replay.analyze(episodes)
 
-        new_rules = await self.extractor.extract_rules(episodes, replay_summary)
-        for rule in new_rules:
-            await self.semantic.add_rule(rule)
-        report.new_rules_extracted = new_rules
+        extracted = await self.extractor.extract_rules(episodes, replay_summary)
+        stored_ids = await self.semantic.add_rules(extracted)
+        # Rules merged into an existing duplicate reinforce it rather than count as new
+        report.new_rules_extracted = [
+            rule for rule, stored_id in zip(extracted, stored_ids) if stored_id == rule.id
+        ]
 
         existing_rules = await self.semantic.get_all_rules()
         invalidated = await self.extractor.validate_existing_rules(existing_rules, episodes)
-        for rule_id in invalidated:
-            await self.semantic.invalidate_rule(rule_id)
+        await self.semantic.invalidate_rules(invalidated)
         report.rules_invalidated = invalidated
 
+        # Keep the rule set (and the prompts built from it) bounded
+        await self.semantic.evict_rules()
+
         pruned = await self.pruner.prune(older_than_days=14)
         report.memories_pruned = pruned
 
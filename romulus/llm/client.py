@@ -1,4 +1,6 @@
+import json
 import time
+from typing import AsyncIterator
 
 import httpx
 from pydantic import BaseModel
@@ -9,6 +11,20 @@ class LLMResponse(BaseModel):
     tokens_used: int
     latency_ms: int
     model: str
+    ttft_ms: int | None = None  # only known when the response was streamed
+    tokens_per_second: float | None = None
+    # Set when the caller cut the stream short; savings are upper-bound estimates
+    stopped_early: bool = False
+    tokens_saved: int = 0
+    latency_saved_ms: int = 0
+
+
+class StreamChunk(BaseModel):
+    """One piece of a streamed completion: a token delta, or the final record."""
+
+    text: str = ""
+    done: bool = False
+    response: LLMResponse | None = None
 
 
 class OllamaClient:
@@ -40,16 +56,7 @@ class OllamaClient:
         resp = await self._client.post("/api/generate", json=payload)
         resp.raise_for_status()
         data = resp.json()
-
-        elapsed_ms = int((time.monotonic() - start) * 1000)
-        tokens = data.get("eval_count", 0) + data.get("prompt_eval_count", 0)
-
-        return LLMResponse(
-            text=data.get("response", "").strip(),
-            tokens_used=tokens,
-            latency_ms=elapsed_ms,
-            model=self.model,
-        )
+        return self._response(data, data.get("response", ""), start)
 
     async def chat(
         self,
@@ -71,16 +78,87 @@ class OllamaClient:
         resp = await self._client.post("/api/chat", json=payload)
         resp.raise_for_status()
         data = resp.json()
+        return self._response(data, data.get("message", {}).get("content", ""), start)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream a completion as token deltas, ending with a done chunk carrying the usage."""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            },
+        }
+        if system:
+            payload["system"] = system
+        async for chunk in self._stream("/api/generate", payload, lambda data: data.get("response", "")):
+            yield chunk
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream a chat reply as token deltas, ending with a done chunk carrying the usage."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            },
+        }
+        async for chunk in self._stream(
+            "/api/chat", payload, lambda data: data.get("message", {}).get("content", ""),
+        ):
+            yield chunk
 
+    async def _stream(self, path: str, payload: dict, delta) -> AsyncIterator[StreamChunk]:
+        # Ollama streams NDJSON: one object per line, the last with "done": true and the usage
+        start = time.monotonic()
+        ttft_ms = None
+        parts = []
+        async with self._client.stream("POST", path, json=payload) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                text = delta(data)
+                if text:
+                    if ttft_ms is None:
+                        ttft_ms = int((time.monotonic() - start) * 1000)
+                    parts.append(text)
+                    yield StreamChunk(text=text)
+                if data.get("done"):
+                    yield StreamChunk(done=True, response=self._response(data, "".join(parts), start, ttft_ms))
+                    return
+        raise RuntimeError("Ollama stream ended without a final record")
+
+    def _response(self, data: dict, text: str, start: float, ttft_ms: int | None = None) -> LLMResponse:
         elapsed_ms = int((time.monotonic() - start) * 1000)
         tokens = data.get("eval_count", 0) + data.get("prompt_eval_count", 0)
-        text = data.get("message", {}).get("content", "").strip()
-
+        # eval_duration is in nanoseconds and covers generation only, not the prompt
+        eval_count, eval_ns = data.get("eval_count", 0), data.get("eval_duration", 0)
         return LLMResponse(
-            text=text,
+            text=text.strip(),
             tokens_used=tokens,
             latency_ms=elapsed_ms,
             model=self.model,
+            ttft_ms=ttft_ms,
+            tokens_per_second=round(eval_count / (eval_ns / 1e9), 1) if eval_count and eval_ns else None,
         )
 
     async def is_available(self) -> bool:
@@ -0,0 +1,47 @@
+class JSONObjectScanner:
+    """Finds where the first top-level JSON object in a token stream ends.
+
+    Text is fed as it arrives and scanned once, character by character,
+    tracking brace depth and whether the scanner is inside a string (and
+    after a backslash in one), so braces in string values don't count.
+    Anything before the first "{", such as a ```json fence, is skipped.
+    feed() returns the object's text as soon as its closing brace arrives;
+    it does not check that the object is valid JSON.
+    """
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._length = 0
+        self._start: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> str | None:
+        offset = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        for i, ch in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._start is not None:
+                    self._in_string = True
+            elif ch == "{":
+                if self._start is None:
+                    self._start = offset + i
+                self._depth += 1
+            elif ch == "}" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._parts)[self._start:offset + i + 1]
+        return None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
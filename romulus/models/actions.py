@@ -8,6 +8,7 @@ class AgentAction(BaseModel):
     target: str
     parameters: dict = {}
     reversible: bool = True
+    agent_id: str = "default"
 
 
 class ActionOutcome(BaseModel):
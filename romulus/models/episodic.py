@@ -27,3 +27,5 @@ class TaskResult(BaseModel):
     vigil_flags: list[str] = []
     tokens_used: int = 0
     latency_ms: int = 0
+    tokens_saved: int = 0
+    latency_saved_ms: int = 0
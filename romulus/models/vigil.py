@@ -11,6 +11,7 @@ class ThreatCategory(str, Enum):
     COST_RUNAWAY = "cost_runaway"
     CONFIDENCE_ANOMALY = "confidence_anomaly"
     CASCADE_RISK = "cascade_risk"
+    UNVERIFIED = "unverified"
 
 
 class VigilVerdict(BaseModel):
@@ -18,8 +18,11 @@ from romulus.dream.engine import DreamEngine
 from romulus.llm.client import OllamaClient
 from romulus.platform import detect_platform
 from romulus.vigil.adaptive import AdaptiveLayer
+from romulus.vigil.anomaly import AnomalyDetector
 from romulus.vigil.incidents import IncidentLogger
 from romulus.vigil.innate import InnateLayer
+from romulus.vigil.judge import JudgeLayer
+from romulus.vigil.limits import RateLimiter
 from romulus.vigil.sentinel import Sentinel
 
 
@@ -53,7 +56,11 @@ class RomulusDaemon:
         self.db = ChronicleDB(db_path=db_path)
         await self.db.initialize()
         self.episodic_store = EpisodicStore(self.db)
-        self.semantic_store = SemanticStore(self.db)
+        self.semantic_store = SemanticStore(
+            self.db,
+            half_life_days=self.config.chronicle.rule_half_life_days,
+            max_rules_per_domain=self.config.chronicle.max_rules_per_domain,
+        )
         self.identity_store = IdentityStore(self.db)
         print("  [+] Chronicle initialized")
 
@@ -70,11 +77,56 @@ class RomulusDaemon:
         print(f"  [+] LLM connected: {self.config.ollama.model}")
 
         # 3. Vigil
-        innate = InnateLayer(rules_path=self.config.vigil.innate_rules_path)
-        adaptive = AdaptiveLayer(self.db)
+        innate = InnateLayer(
+            rules_path=self.config.vigil.innate_rules_path,
+            max_scan_chars=self.config.vigil.max_scan_chars,
+            cache_dir=f"{self.config.data_dir}/cache" if self.config.vigil.rules_cache_enabled else None,
+        )
+        adaptive = AdaptiveLayer(
+            self.db,
+            max_cells=self.config.vigil.max_memory_cells,
+            max_pattern_chars=self.config.vigil.max_memory_cell_chars,
+            half_life_hours=self.config.vigil.memory_cell_half_life_hours,
+            max_scan_chars=self.config.vigil.max_scan_chars,
+        )
         await adaptive.load_memory_cells()
-        self.incident_logger = IncidentLogger(self.db)
-        self.sentinel = Sentinel(innate, adaptive, self.incident_logger)
+        self.incident_logger = IncidentLogger(
+            self.db,
+            queue_size=self.config.vigil.incident_queue_size,
+            bucket_minutes=self.config.vigil.incident_bucket_minutes,
+        )
+        await self.incident_logger.load_counters()
+        self.incident_logger.start()
+        rate_limiter = RateLimiter(
+            max_actions_per_minute=self.config.vigil.max_actions_per_minute,
+            max_tokens_per_minute=self.config.vigil.max_tokens_per_minute,
+        )
+        rate_limiter.configure(innate.resource_limits)
+        judge = None
+        if self.config.vigil.judge_enabled:
+            judge = JudgeLayer(
+                self.llm,
+                timeout_seconds=self.config.vigil.judge_timeout_seconds,
+                fail_closed=self.config.vigil.judge_fail_closed,
+                max_concurrent=self.config.vigil.judge_max_concurrent,
+                cache_size=self.config.vigil.judge_cache_size,
+                action_types=tuple(self.config.vigil.judge_action_types),
+            )
+        anomaly = None
+        if self.config.vigil.anomaly_enabled:
+            anomaly = AnomalyDetector(
+                alpha=self.config.vigil.anomaly_alpha,
+                threshold=self.config.vigil.anomaly_threshold,
+                warmup=self.config.vigil.anomaly_warmup,
+            )
+        self.sentinel = Sentinel(
+            innate, adaptive, self.incident_logger, rate_limiter,
+            cache_size=self.config.vigil.verdict_cache_size,
+            judge=judge,
+            anomaly=anomaly,
+        )
+        if self.config.vigil.rules_reload_interval_seconds > 0:
+            innate.start_watching(self.config.vigil.rules_reload_interval_seconds)
         print("  [+] Vigil armed")
 
         # 4. Soul spec
@@ -101,6 +153,10 @@ class RomulusDaemon:
             sentinel=self.sentinel,
             tools=tools,
             soul_spec=soul_spec,
+            max_prompt_rules=self.config.agent.max_prompt_rules,
+            rule_token_budget=self.config.agent.rule_token_budget,
+            agent_id=self.config.name,
+            stream_responses=self.config.agent.stream_responses,
         )
         print("  [+] Agent core ready")
 
@@ -173,16 +229,28 @@ class RomulusDaemon:
             "rules_learned": rules_count,
             "total_traces": traces_count,
             "model": self.config.ollama.model,
+            "vigil_rules": self.sentinel.innate.reload_stats(),
+            "vigil_incident_queue": self.incident_logger.queue_stats(),
+            "vigil_incidents_24h": self.incident_logger.incident_stats(hours=24),
+            "vigil_memory": self.sentinel.adaptive.memory_stats(),
+            "vigil_judge": self.sentinel.judge.stats() if self.sentinel.judge else None,
+            "vigil_anomaly": self.sentinel.anomaly.stats() if self.sentinel.anomaly else None,
+            "agent_stream": self.agent.stream_stats(),
             "platform": detect_platform().model_dump(),
         }
 
     async def _run_dream_cycle(self):
         await self.trigger_dream()
+        await self.sentinel.adaptive.save_memory_cells()
 
     async def shutdown(self):
         print("\n  Romulus is going to sleep. Goodnight.")
         self.running = False
         self.scheduler.shutdown(wait=False)
+        await self.sentinel.innate.stop_watching()
+        await self.incident_logger.stop()
+        # After the logger has drained, so evicted cells are not re-inserted behind us
+        await self.sentinel.adaptive.save_memory_cells()
         await self.llm.close()
 
 
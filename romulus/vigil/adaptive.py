@@ -1,48 +1,320 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
 from romulus.chronicle.database import ChronicleDB
 from romulus.models.actions import AgentAction
 from romulus.models.vigil import ThreatCategory, VigilVerdict
+from romulus.vigil.automaton import AhoCorasick
+
+# Loop, rate-limit and judge-outage blocks say nothing about the target itself
+TRANSIENT_CATEGORIES = (ThreatCategory.LOOPING, ThreatCategory.COST_RUNAWAY, ThreatCategory.UNVERIFIED)
+
+# Longest target learned as a cell. A longer one is a payload rather than a
+# command, would only ever match itself, and makes the automaton huge
+MAX_CELL_CHARS = 256
+
+# A judge ruling is one LLM opinion on one action. Only severe rulings on
+# targets at least this long are learned, so a ruling on something like
+# "ls" cannot block every later action that happens to contain it
+MIN_JUDGE_CELL_CHARS = 8
+
+# Eviction trims the cells to this fraction of the cap, so the automaton is
+# rebuilt once per batch of new cells rather than on every insert
+EVICTION_LOW_WATER = 0.9
+
+_SAVE_HITS = """UPDATE vigil_memory_cells
+                SET hit_count = hit_count + ?, last_seen = MAX(last_seen, ?)
+                WHERE pattern = ? AND category = ?"""
+
+_DELETE_CELL = "DELETE FROM vigil_memory_cells WHERE pattern = ? AND category = ?"
+
+
+def _build_automaton(patterns: list[tuple[str, int]]) -> AhoCorasick:
+    automaton = AhoCorasick(auto_build=False)
+    for pattern, index in patterns:
+        automaton.add(pattern, index)
+    automaton.build()
+    return automaton
+
+
+def _to_epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def is_learnable(target: str, category: str | None, layer: str, action_type: str) -> bool:
+    """Whether a block of target should become a memory cell.
+
+    Shared by AdaptiveLayer.learn() and IncidentLogger, so the cells in
+    memory and in vigil_memory_cells follow the same rules. The judge rules
+    on a tool call's arguments, so its target (the tool name) isn't learned.
+    """
+    if category is None or category in TRANSIENT_CATEGORIES or layer == "adaptive":
+        return False
+    if layer == "judge":
+        if action_type == "tool_call":
+            return False
+        return category == ThreatCategory.DESTRUCTIVE and MIN_JUDGE_CELL_CHARS <= len(target) <= MAX_CELL_CHARS
+    return 0 < len(target) <= MAX_CELL_CHARS
 
 
 class MemoryCell:
-    def __init__(self, pattern: str, category: str, reason: str):
+    def __init__(self, pattern: str, category: str, reason: str, hits: int = 1, last_hit: float = 0.0):
+        self.source = pattern
         self.pattern = pattern.lower()
         self.category = category
         self.reason = reason
+        self.hits = hits
+        self.last_hit = last_hit
+        # Adaptive hits not yet written back to vigil_memory_cells. This is
+        # their only way into the table: IncidentLogger skips adaptive rows
+        self.unsaved_hits = 0
+
+    def score(self, now: float, half_life: float) -> float:
+        """Hit count halved for every half_life seconds since the last hit."""
+        return self.hits * 0.5 ** (max(0.0, now - self.last_hit) / half_life)
 
 
 class AdaptiveLayer:
-    def __init__(self, db: ChronicleDB):
+    """Blocks actions mentioning anything Vigil has blocked before.
+
+    Cells are matched in one pass by an Aho-Corasick automaton that is
+    rebuilt in a worker thread, and evicted by decayed hit count beyond
+    max_cells or max_pattern_chars.
+    """
+
+    def __init__(
+        self,
+        db: ChronicleDB,
+        max_cells: int = 10_000,
+        half_life_hours: float = 168.0,
+        clock: Callable[[], float] = time.time,
+        max_scan_chars: int = 262_144,
+        max_pattern_chars: int = 500_000,
+    ):
         self.db = db
+        self.max_scan_chars = max_scan_chars
+        self.max_cells = max_cells
+        self.max_pattern_chars = max_pattern_chars
+        self.half_life = half_life_hours * 3600
+        self._clock = clock
         self._memory_cells: list[MemoryCell] = []
+        # The cells the automaton's priorities index into. The same list as
+        # _memory_cells except between an eviction and the rebuild after it
+        self._matched = self._memory_cells
+        self._automaton = AhoCorasick(auto_build=False)
+        self._rebuild_task: asyncio.Task | None = None
+        # Bumped whenever _memory_cells is replaced, invalidating a rebuild in flight
+        self._epoch = 0
+        self._pattern_chars = 0
+        self._patterns: dict[str, MemoryCell] = {}
+        self._evicted: dict[tuple[str, str], None] = {}
+        self.evictions = 0
+        # Bumped whenever cells change, so cached verdicts can be discarded
+        self.generation = 0
 
     async def load_memory_cells(self):
+        # IncidentLogger keeps this table in step with vigil_incidents, so boot
+        # cost depends on the number of distinct cells, not the incident history
         rows = await self.db.execute(
-            "SELECT DISTINCT target, category, reason FROM vigil_incidents WHERE blocked = 1"
+            """SELECT pattern, category, reason, hit_count, last_seen
+               FROM vigil_memory_cells ORDER BY first_seen, rowid"""
         )
-        self._memory_cells = [
-            MemoryCell(
-                pattern=row["target"],
+        self._memory_cells = []
+        self._patterns = {}
+        self._evicted = {}
+        self._pattern_chars = 0
+        for row in rows:
+            if len(row["pattern"]) > MAX_CELL_CHARS:
+                # Learned before the cap; delete it on the next save
+                self._evicted[(row["pattern"], row["category"])] = None
+                continue
+            cell = MemoryCell(
+                pattern=row["pattern"],
                 category=row["category"],
                 reason=f"Previously blocked: {row['reason']}",
+                hits=row["hit_count"],
+                last_hit=_to_epoch(row["last_seen"]),
             )
-            for row in rows
-        ]
+            self._memory_cells.append(cell)
+            self._patterns[cell.pattern] = cell
+            self._pattern_chars += len(cell.pattern)
+        self._evict()
+        self._epoch += 1
+        cells = self._memory_cells
+        automaton = await asyncio.to_thread(_build_automaton, [(c.pattern, i) for i, c in enumerate(cells)])
+        self._install(automaton, cells)
 
     async def check(self, action: AgentAction) -> VigilVerdict:
-        target_lower = action.target.lower()
-        params_lower = str(action.parameters).lower()
-        full_text = f"{target_lower} {params_lower}"
+        cell = self.match(action)
+        if cell is None:
+            return VigilVerdict(approved=True, layer="adaptive")
+        return self.record_hit(cell)
 
-        for cell in self._memory_cells:
-            if cell.pattern in full_text:
-                return VigilVerdict(
-                    approved=False,
-                    category=ThreatCategory(cell.category),
-                    layer="adaptive",
-                    reason=cell.reason,
-                )
+    def match(self, action: AgentAction) -> MemoryCell | None:
+        """The cell an action mentions, without counting it as a hit."""
+        # The innate layer refuses anything longer; here just bound the work
+        full_text = f"{action.target} {action.parameters}"[:self.max_scan_chars].lower()
+        index = self._automaton.find(full_text)
+        return None if index is None else self._matched[index]
 
-        return VigilVerdict(approved=True, layer="adaptive")
+    def record_hit(self, cell: MemoryCell) -> VigilVerdict:
+        """Count a hit on a cell and return its blocking verdict."""
+        cell.hits += 1
+        cell.unsaved_hits += 1
+        cell.last_hit = self._clock()
+        return VigilVerdict(
+            approved=False,
+            category=ThreatCategory(cell.category),
+            layer="adaptive",
+            reason=cell.reason,
+        )
 
     async def add_memory_cell(self, pattern: str, category: str, reason: str):
-        self._memory_cells.append(MemoryCell(pattern, category, reason))
+        self._add(MemoryCell(pattern, category, reason, last_hit=self._clock()))
+
+    def learn(self, action: AgentAction, verdict: VigilVerdict):
+        """Remember a target another layer just blocked, if is_learnable() allows it."""
+        if verdict.approved or not is_learnable(action.target, verdict.category, verdict.layer, action.action_type):
+            return
+        known = self._patterns.get(action.target.lower())
+        if known is not None:
+            # The incident upsert counts this hit in the table, so it is not unsaved
+            known.hits += 1
+            known.last_hit = self._clock()
+            return
+        self._add(MemoryCell(
+            pattern=action.target,
+            category=verdict.category.value,
+            reason=f"Previously blocked: {verdict.reason}",
+            last_hit=self._clock(),
+        ))
+
+    async def save_memory_cells(self):
+        """Write unsaved hit counts to vigil_memory_cells and delete evicted cells."""
+        dirty = [(cell, cell.unsaved_hits) for cell in self._memory_cells if cell.unsaved_hits]
+        evicted = list(self._evicted)
+        if not dirty and not evicted:
+            return
+        async with self.db.transaction() as conn:
+            if dirty:
+                await conn.executemany(_SAVE_HITS, [
+                    (hits, _to_iso(cell.last_hit), cell.source, cell.category) for cell, hits in dirty
+                ])
+            if evicted:
+                await conn.executemany(_DELETE_CELL, evicted)
+        # Checks may have run while the transaction was open
+        for cell, hits in dirty:
+            cell.unsaved_hits -= hits
+        for key in evicted:
+            self._evicted.pop(key, None)
+
+    async def flush(self):
+        """Wait until any scheduled automaton rebuild has been swapped in."""
+        while self._rebuild_task is not None:
+            await self._rebuild_task
+
+    def memory_stats(self) -> dict:
+        return {
+            "cells": len(self._memory_cells),
+            "max_cells": self.max_cells,
+            "pattern_chars": self._pattern_chars,
+            "max_pattern_chars": self.max_pattern_chars,
+            "pending_cells": self._automaton.pending_count,
+            "evictions": self.evictions,
+            "unsaved_evictions": len(self._evicted),
+        }
+
+    def _add(self, cell: MemoryCell):
+        self._evicted.pop((cell.source, cell.category), None)
+        self._automaton.add(cell.pattern, len(self._matched))
+        self._matched.append(cell)
+        if self._matched is not self._memory_cells:
+            self._memory_cells.append(cell)
+        self._patterns[cell.pattern] = cell
+        self._pattern_chars += len(cell.pattern)
+        self.generation += 1
+        if self._over_capacity():
+            self._evict()
+        if self._automaton.needs_build() or self._matched is not self._memory_cells:
+            self._schedule_rebuild()
+
+    def _over_capacity(self) -> bool:
+        return bool(
+            (self.max_cells and len(self._memory_cells) > self.max_cells)
+            or (self.max_pattern_chars and self._pattern_chars > self.max_pattern_chars)
+        )
+
+    def _evict(self):
+        """Drop the lowest-scoring cells down to the low-water marks, keeping order."""
+        if not self._over_capacity():
+            return
+        keep = int(self.max_cells * EVICTION_LOW_WATER) if self.max_cells else len(self._memory_cells)
+        keep_chars = int(self.max_pattern_chars * EVICTION_LOW_WATER) if self.max_pattern_chars else float("inf")
+        now = self._clock()
+        cells = self._memory_cells
+        # Ties go to the most recently added cell, so a new cell is never its own victim
+        ranked = sorted(
+            range(len(cells)),
+            key=lambda i: (cells[i].score(now, self.half_life), cells[i].last_hit, i),
+            reverse=True,
+        )
+        survivors = set()
+        chars = 0
+        for i in ranked:
+            if len(survivors) == keep:
+                break
+            if chars + len(cells[i].pattern) <= keep_chars:
+                survivors.add(i)
+                chars += len(cells[i].pattern)
+        kept = []
+        for i, cell in enumerate(self._memory_cells):
+            if i in survivors:
+                kept.append(cell)
+            else:
+                self._evicted[(cell.source, cell.category)] = None
+                if self._patterns.get(cell.pattern) is cell:
+                    del self._patterns[cell.pattern]
+        self.evictions += len(self._memory_cells) - len(kept)
+        self._memory_cells = kept
+        self._pattern_chars = chars
+        self._epoch += 1
+
+    def _schedule_rebuild(self):
+        if self._rebuild_task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            cells = self._memory_cells
+            self._install(_build_automaton([(c.pattern, i) for i, c in enumerate(cells)]), cells)
+            return
+        self._rebuild_task = loop.create_task(self._rebuild())
+
+    async def _rebuild(self):
+        """Build an automaton over the current cells in a thread, then swap it in."""
+        try:
+            while True:
+                epoch = self._epoch
+                cells = self._memory_cells
+                built = len(cells)
+                patterns = [(cell.pattern, i) for i, cell in enumerate(cells)]
+                automaton = await asyncio.to_thread(_build_automaton, patterns)
+                if epoch == self._epoch:
+                    break
+            # Cells learned while the thread was building are checked as pending
+            for index in range(built, len(cells)):
+                automaton.add(cells[index].pattern, index)
+            self._install(automaton, cells)
+        finally:
+            self._rebuild_task = None
+
+    def _install(self, automaton: AhoCorasick, cells: list[MemoryCell]):
+        self._automaton = automaton
+        self._matched = cells
+        self.generation += 1
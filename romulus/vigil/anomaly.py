@@ -0,0 +1,105 @@
+import math
+
+from romulus.models.vigil import ThreatCategory, VigilVerdict
+
+# Smallest standard deviation a metric is judged against, as (absolute,
+# fraction of the mean), so a metric that has barely varied yet does not
+# turn every small wobble into an outlier
+_MIN_STD = {
+    "confidence": (0.05, 0.0),
+    "latency_ms": (1.0, 0.1),
+    "tokens": (1.0, 0.1),
+}
+
+# Metrics where only an unusually high value is suspicious
+_HIGH_ONLY = frozenset({"latency_ms", "tokens"})
+
+
+class EWMAStat:
+    """Exponentially weighted mean and variance of one metric."""
+
+    __slots__ = ("mean", "var", "n")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.var = 0.0
+        self.n = 0
+
+    def zscore(self, x: float, min_std: tuple[float, float]) -> float:
+        floor = max(min_std[0], min_std[1] * abs(self.mean))
+        return (x - self.mean) / max(math.sqrt(self.var), floor)
+
+    def update(self, x: float, alpha: float):
+        if self.n == 0:
+            self.mean = x
+        else:
+            diff = x - self.mean
+            incr = alpha * diff
+            self.mean += incr
+            self.var = (1 - alpha) * (self.var + diff * incr)
+        self.n += 1
+
+
+class AnomalyDetector:
+    """Flags LLM responses that are out of line with recent ones.
+
+    For every decision type (respond, or the tool the model picked) it keeps
+    an EWMA mean and variance of the response's confidence, latency and
+    token usage, updated in O(1) per response and never read from the
+    database. Once a decision type has seen `warmup` responses, a value
+    more than `threshold` standard deviations from its mean is flagged as
+    CONFIDENCE_ANOMALY; latency and tokens are only flagged on the high
+    side. A decision naming a tool that does not exist is flagged as
+    HALLUCINATION and kept out of the statistics.
+
+    Flags are approved verdicts: they are logged as incidents, not blocks.
+    """
+
+    def __init__(self, alpha: float = 0.1, threshold: float = 3.0, warmup: int = 20):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self._stats: dict[str, dict[str, EWMAStat]] = {}
+        self.observed = 0
+        self.flagged = 0
+
+    def observe(
+        self, decision: str, confidence: float, latency_ms: int, tokens: int, known: bool = True,
+    ) -> list[VigilVerdict]:
+        """Update the decision type's statistics and return any flags raised."""
+        self.observed += 1
+        if not known:
+            self.flagged += 1
+            return [VigilVerdict(
+                approved=True,
+                category=ThreatCategory.HALLUCINATION,
+                layer="anomaly",
+                reason=f"Model chose unknown tool '{decision}'",
+            )]
+
+        stats = self._stats.get(decision)
+        if stats is None:
+            stats = self._stats[decision] = {name: EWMAStat() for name in _MIN_STD}
+
+        flags = []
+        for name, value in (("confidence", confidence), ("latency_ms", latency_ms), ("tokens", tokens)):
+            stat = stats[name]
+            if stat.n >= self.warmup:
+                z = stat.zscore(value, _MIN_STD[name])
+                if z > self.threshold or (z < -self.threshold and name not in _HIGH_ONLY):
+                    flags.append(VigilVerdict(
+                        approved=True,
+                        category=ThreatCategory.CONFIDENCE_ANOMALY,
+                        layer="anomaly",
+                        reason=f"'{decision}' {name} {value:g} is {z:+.1f} sd from its mean {stat.mean:.3g}",
+                    ))
+            stat.update(value, self.alpha)
+        self.flagged += len(flags)
+        return flags
+
+    def stats(self) -> dict:
+        return {
+            "observed": self.observed,
+            "flagged": self.flagged,
+            "decision_types": len(self._stats),
+        }
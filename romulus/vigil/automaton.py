@@ -0,0 +1,123 @@
+from array import array
+
+NO_MATCH = 2**62
+
+# Transition keys pack (state, code point) into one int: code points fit in 21 bits
+_SHIFT = 21
+
+
+class AhoCorasick:
+    """Pure-Python Aho-Corasick automaton over literal patterns.
+
+    Each pattern carries an integer priority; find() returns the lowest
+    priority among all patterns occurring in a text, in one pass over it.
+
+    Insertion is incremental: new patterns are checked with plain substring
+    tests until enough of them are pending, then the next search folds them
+    into the trie and recomputes failure links. The pending limit grows with
+    the automaton so rebuilds get rarer as it gets bigger, and a bulk load is
+    a single rebuild on first use. With auto_build=False, find() never
+    builds; the owner calls build() when needs_build() says so.
+    """
+
+    def __init__(self, min_pending: int = 64, auto_build: bool = True):
+        self.min_pending = min_pending
+        self.auto_build = auto_build
+        self._goto: dict[int, int] = {}
+        self._parent = array("q", [0])
+        self._char = array("q", [0])
+        # States grouped by depth, so failure links can be computed shallowest first
+        self._levels: list[array] = []
+        self._own = array("q", [NO_MATCH])
+        self._fail = array("q", [0])
+        self._out = array("q", [NO_MATCH])
+        self._patterns = 0
+        self._pending: list[tuple[str, int]] = []
+        self._pending_best: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._patterns + len(self._pending)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._parent)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def needs_build(self) -> bool:
+        return len(self._pending) > max(self.min_pending, self._patterns // 256)
+
+    def add(self, pattern: str, priority: int):
+        if not pattern:
+            return
+        if pattern in self._pending_best and self._pending_best[pattern] <= priority:
+            return
+        self._pending_best[pattern] = priority
+        self._pending.append((pattern, priority))
+
+    def find(self, text: str) -> int | None:
+        if self.auto_build and self.needs_build():
+            self.build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        best = NO_MATCH
+        state = 0
+        for ch in text:
+            c = ord(ch)
+            nxt = goto.get(state << _SHIFT | c)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto.get(state << _SHIFT | c)
+            state = nxt or 0
+            if out[state] < best:
+                best = out[state]
+
+        for pattern, priority in self._pending:
+            if priority < best and pattern in text:
+                best = priority
+
+        return None if best == NO_MATCH else best
+
+    def build(self):
+        """Fold pending patterns into the trie and recompute failure links."""
+        goto = self._goto
+        for pattern, priority in self._pending:
+            state = 0
+            for depth, ch in enumerate(pattern):
+                key = state << _SHIFT | ord(ch)
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = len(self._parent)
+                    goto[key] = nxt
+                    self._parent.append(state)
+                    self._char.append(ord(ch))
+                    if depth == len(self._levels):
+                        self._levels.append(array("q"))
+                    self._levels[depth].append(nxt)
+                    self._own.append(NO_MATCH)
+                state = nxt
+            if self._own[state] == NO_MATCH:
+                self._patterns += 1
+            self._own[state] = min(self._own[state], priority)
+        self._pending.clear()
+        self._pending_best.clear()
+
+        # Depth-1 states fail to the root; deeper ones extend their parent's failure link
+        fail = array("q", bytes(8 * len(self._parent)))
+        out = array("q", self._own)
+        parent, char = self._parent, self._char
+        for level in self._levels[1:]:
+            for s in level:
+                c = char[s]
+                f = fail[parent[s]]
+                nxt = goto.get(f << _SHIFT | c)
+                while nxt is None and f:
+                    f = fail[f]
+                    nxt = goto.get(f << _SHIFT | c)
+                fail[s] = nxt = nxt or 0
+                if out[nxt] < out[s]:
+                    out[s] = out[nxt]
+        self._fail = fail
+        self._out = out
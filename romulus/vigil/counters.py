@@ -0,0 +1,81 @@
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable
+
+
+class IncidentCounters:
+    """Per-minute incident counts, kept in memory for windowed queries.
+
+    Each minute with incidents gets a bucket holding its total and its
+    counts per category and per layer, next to a running total. count()
+    answers "how many in the last N minutes" by bisecting to the first
+    bucket of the window and subtracting running totals, in O(log n) no
+    matter how many incidents there were; breakdown() sums only the
+    buckets inside the window. Buckets older than retention_minutes are
+    dropped, and windows are minute-aligned, so a count can include up to
+    one extra minute at the old edge.
+    """
+
+    def __init__(self, retention_minutes: int = 7 * 24 * 60, clock: Callable[[], float] = time.time):
+        self.retention_minutes = retention_minutes
+        self._clock = clock
+        self._minutes: list[int] = []
+        self._running: list[int] = []  # running total up to and including each bucket
+        self._categories: list[Counter] = []
+        self._layers: list[Counter] = []
+        self._expired = 0  # running total of dropped buckets
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._minutes)
+
+    def add(self, category: str, layer: str, count: int = 1, minute: int | None = None):
+        """Count incidents in the current minute, or an earlier one when seeding."""
+        if minute is None:
+            minute = int(self._clock() // 60)
+        if not self._minutes or minute > self._minutes[-1]:
+            self._minutes.append(minute)
+            self._running.append(self.total)
+            self._categories.append(Counter())
+            self._layers.append(Counter())
+            self._expire(minute)
+        elif minute < self._minutes[-1]:
+            # Seeding is done in time order; a late straggler joins the newest bucket
+            minute = self._minutes[-1]
+        self.total += count
+        self._running[-1] += count
+        self._categories[-1][category] += count
+        self._layers[-1][layer] += count
+
+    def count(self, minutes: int) -> int:
+        """Incidents in the last `minutes` minutes, including the current one."""
+        start = self._first_bucket(minutes)
+        before = self._running[start - 1] if start > 0 else self._expired
+        return self.total - before
+
+    def breakdown(self, minutes: int) -> dict:
+        categories: Counter = Counter()
+        layers: Counter = Counter()
+        for i in range(self._first_bucket(minutes), len(self._minutes)):
+            categories.update(self._categories[i])
+            layers.update(self._layers[i])
+        return {
+            "total": self.count(minutes),
+            "by_category": dict(categories),
+            "by_layer": dict(layers),
+        }
+
+    def _first_bucket(self, minutes: int) -> int:
+        cutoff = int(self._clock() // 60) - minutes + 1
+        return bisect_left(self._minutes, cutoff)
+
+    def _expire(self, now_minute: int):
+        stale = bisect_left(self._minutes, now_minute - self.retention_minutes + 1)
+        # Trimming a list front is O(n); do it in batches rather than per bucket
+        if stale and stale * 4 >= len(self._minutes):
+            self._expired = self._running[stale - 1]
+            del self._minutes[:stale]
+            del self._running[:stale]
+            del self._categories[:stale]
+            del self._layers[:stale]
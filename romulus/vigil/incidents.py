@@ -1,43 +1,212 @@
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from romulus.chronicle.database import ChronicleDB
 from romulus.models.actions import AgentAction
 from romulus.models.vigil import VigilVerdict
+from romulus.vigil.adaptive import is_learnable
+from romulus.vigil.counters import IncidentCounters
+
+_UPSERT = """INSERT INTO vigil_incidents
+             (id, timestamp, action_type, target, category, layer, reason, blocked, count, last_seen, fingerprint)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             ON CONFLICT(fingerprint) DO UPDATE SET
+                 count = count + excluded.count, last_seen = excluded.last_seen"""
+
+_UPSERT_CELL = """INSERT INTO vigil_memory_cells
+                  (pattern, category, reason, hit_count, first_seen, last_seen)
+                  VALUES (?, ?, ?, ?, ?, ?)
+                  ON CONFLICT(pattern, category) DO UPDATE SET
+                      hit_count = hit_count + excluded.hit_count, last_seen = excluded.last_seen"""
+
+
+def _minute(prefix: str) -> int:
+    return int(datetime.fromisoformat(prefix).replace(tzinfo=timezone.utc).timestamp() // 60)
 
 
 class IncidentLogger:
-    def __init__(self, db: ChronicleDB):
+    """Records Vigil incidents, batched from a bounded queue once started.
+
+    Identical incidents within bucket_minutes share one counted row, and
+    learnable blocks are upserted into vigil_memory_cells alongside them.
+    """
+
+    def __init__(
+        self,
+        db: ChronicleDB,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        counters: IncidentCounters | None = None,
+        bucket_minutes: int = 60,
+    ):
         self.db = db
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.bucket_minutes = bucket_minutes
+        self.counters = counters if counters is not None else IncidentCounters()
+        self.counters_loaded = False
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self.dropped = 0
+        self.write_errors = 0
 
     async def log(self, action: AgentAction, verdict: VigilVerdict):
-        await self.db.execute_insert(
-            """INSERT INTO vigil_incidents
-               (id, timestamp, action_type, target, category, layer, reason, blocked)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
+        await self.log_many([(action, verdict)])
+
+    async def log_many(self, incidents: list[tuple[AgentAction, VigilVerdict]]):
+        """Log several incidents, written together in one transaction."""
+        now = datetime.utcnow()
+        timestamp = now.isoformat()
+        bucket = int(now.replace(tzinfo=timezone.utc).timestamp() // (self.bucket_minutes * 60))
+        rows = []
+        for action, verdict in incidents:
+            category = verdict.category.value if verdict.category else "unknown"
+            identity = "\x00".join((action.target, category, verdict.layer, verdict.reason))
+            digest = hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+            rows.append((
                 str(uuid4()),
-                datetime.utcnow().isoformat(),
+                timestamp,
                 action.action_type,
                 action.target,
-                verdict.category.value if verdict.category else "unknown",
+                category,
                 verdict.layer,
                 verdict.reason,
                 int(not verdict.approved),
-            ),
-        )
+                f"{digest}:{bucket}",
+            ))
+            self.counters.add(category, verdict.layer)
+        if self._worker is None:
+            await self._write(rows)
+            return
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def start(self):
+        """Switch to queued logging, drained by a background task."""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = asyncio.create_task(self._drain())
+
+    async def flush(self):
+        """Wait until every queued incident has been written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        await self.flush()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+
+    def queue_stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+    async def _drain(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._write(batch)
+            except Exception:
+                self.write_errors += len(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, rows: list[tuple]):
+        # Merge repeats within the batch first, so each aggregate is one statement
+        merged: dict[str, list] = {}
+        for row in rows:
+            aggregate = merged.get(row[8])
+            if aggregate is None:
+                merged[row[8]] = [*row[:8], 1, row[1], row[8]]
+            else:
+                aggregate[8] += 1
+                aggregate[9] = row[1]
+        # The same rules as AdaptiveLayer.learn(). In particular adaptive blocks are
+        # hits on an existing cell, which the layer counts itself
+        cells = [
+            (target, category, reason, count, first_seen, last_seen)
+            for _, first_seen, action_type, target, category, layer, reason, blocked, count, last_seen, _
+            in merged.values()
+            if blocked and is_learnable(target, category, layer, action_type)
+        ]
+        async with self.db.transaction() as conn:
+            await conn.executemany(_UPSERT, merged.values())
+            if cells:
+                await conn.executemany(_UPSERT_CELL, cells)
 
     async def get_recent_incidents(self, hours: int = 24) -> list[dict]:
+        """Incidents whose latest event falls within the window, latest first."""
         since = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
         return await self.db.execute(
-            "SELECT * FROM vigil_incidents WHERE timestamp >= ? ORDER BY timestamp DESC",
+            """SELECT * FROM vigil_incidents WHERE COALESCE(last_seen, timestamp) >= ?
+               ORDER BY COALESCE(last_seen, timestamp) DESC""",
+            (since,),
+        )
+
+    async def load_counters(self):
+        """Seed the in-memory counters from incidents within their retention.
+
+        An aggregated row only records its first and latest event, so its
+        count is spread evenly over the minutes between them.
+        """
+        retention = self.counters.retention_minutes
+        since = (datetime.utcnow() - timedelta(minutes=retention)).isoformat()
+        # Grouped on the minute prefixes of the ISO timestamps, using the last_seen index
+        rows = await self.db.execute(
+            """SELECT substr(timestamp, 1, 16) AS first_minute,
+                      substr(COALESCE(last_seen, timestamp), 1, 16) AS last_minute,
+                      category, layer, SUM(count) AS cnt
+               FROM vigil_incidents WHERE COALESCE(last_seen, timestamp) >= ?
+               GROUP BY first_minute, last_minute, category, layer""",
             (since,),
         )
+        by_minute: dict[int, Counter] = {}
+        for row in rows:
+            first, last = _minute(row["first_minute"]), _minute(row["last_minute"])
+            span = max(1, last - first + 1)
+            share, extra = divmod(row["cnt"], span)
+            key = (row["category"], row["layer"])
+            for i in range(span):
+                # The remainder goes to the latest minutes
+                count = share + (i >= span - extra)
+                if count:
+                    by_minute.setdefault(first + i, Counter())[key] += count
+        self.counters = IncidentCounters(retention, clock=self.counters._clock)
+        for minute in sorted(by_minute):
+            for (category, layer), count in by_minute[minute].items():
+                self.counters.add(category, layer, count, minute=minute)
+        self.counters_loaded = True
+
+    def incident_stats(self, hours: int = 24) -> dict:
+        """Incident totals per category and layer from the in-memory counters."""
+        return self.counters.breakdown(hours * 60)
 
     async def get_incident_count(self, hours: int = 24) -> int:
+        if self.counters_loaded and hours * 60 <= self.counters.retention_minutes:
+            return self.counters.count(hours * 60)
         since = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
         rows = await self.db.execute(
-            "SELECT COUNT(*) as cnt FROM vigil_incidents WHERE timestamp >= ?",
+            "SELECT COALESCE(SUM(count), 0) as cnt FROM vigil_incidents WHERE COALESCE(last_seen, timestamp) >= ?",
             (since,),
         )
         return rows[0]["cnt"] if rows else 0
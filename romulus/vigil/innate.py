@@ -1,96 +1,359 @@
-import re
+import asyncio
+import hashlib
+import json
+import os
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
 
 import yaml
 
 from romulus.models.actions import AgentAction
 from romulus.models.vigil import ThreatCategory, VigilVerdict
+from romulus.vigil.matcher import CombinedMatcher, InnateRule
+from romulus.vigil.windows import SlidingWindowCounter
+
+DEFAULT_RULES_PATH = str(Path(__file__).parent / "innate_rules.yaml")
+
+# Bumped whenever the cached form of a rules file changes meaning
+RULES_CACHE_FORMAT = 1
+
+# Compiled rule sets by the sha256 of their file; they are immutable, so every
+# layer loading the same rules shares one
+_COMPILED: OrderedDict[str, "InnateRuleSet"] = OrderedDict()
+_COMPILED_MAX = 8
+_COMPILED_LOCK = threading.Lock()
+
+
+class InnateRuleSet:
+    """One immutable compiled version of the innate rules file.
+
+    Each combination of tagged action type and target gets its own matcher,
+    so dispatch is a dict lookup and a reload swaps in a whole new set.
+    """
+
+    def __init__(self, config: dict, validated: bool = False):
+        if not isinstance(config, dict):
+            raise ValueError("Innate rules file must be a mapping")
+        self.config = config
+
+        # Destructive patterns take priority over scope violations, so they come first
+        rules = [
+            InnateRule(
+                pattern=entry["pattern"],
+                category=ThreatCategory(entry["category"]),
+                reason=entry["reason"],
+                case_insensitive=bool(entry.get("case_insensitive")),
+                action_types=entry.get("action_types"),
+                targets=entry.get("targets"),
+            )
+            for entry in config.get("destructive_patterns", [])
+        ]
+        rules += [
+            InnateRule(
+                pattern=entry["pattern"],
+                category=ThreatCategory(entry["category"]),
+                reason=entry["reason"],
+                case_insensitive=bool(entry.get("case_insensitive")),
+                literal=True,
+                action_types=entry.get("action_types"),
+                targets=entry.get("targets"),
+            )
+            for entry in config.get("scope_violations", [])
+        ]
+        self.matcher = CombinedMatcher(rules, validated)
+        self._action_types, self._targets, self._dispatch = self._build_dispatch(rules)
+        self.safe_tools = frozenset(config.get("safe_tools", []))
+
+        loop_cfg = config.get("loop_detection", {})
+        self.max_identical = loop_cfg.get("max_identical_actions", 10)
+        self.loop_window = loop_cfg.get("window_seconds", 60)
+        self.max_tracked_keys = loop_cfg.get("max_tracked_keys", 10_000)
+        self.resource_limits = config.get("resource_limits", {})
+
+    def matcher_for(self, action_type: str, target: str) -> CombinedMatcher:
+        """The matcher holding only the rules that apply to this kind of action."""
+        if not self._dispatch:
+            return self.matcher
+        key = (
+            action_type if action_type in self._action_types else None,
+            target if target in self._targets else None,
+        )
+        return self._dispatch[key]
+
+    def is_safe_call(self, action: AgentAction) -> bool:
+        return action.action_type == "tool_call" and action.target in self.safe_tools and not action.parameters
+
+    def _build_dispatch(self, rules: list[InnateRule]):
+        action_types = frozenset().union(*(r.action_types for r in rules if r.action_types))
+        targets = frozenset().union(*(r.targets for r in rules if r.targets))
+        if not action_types and not targets:
+            return action_types, targets, {}
+        # Many keys share a rule subset; compile each distinct subset once. The
+        # full matcher has already validated every rule
+        by_subset: dict[tuple[int, ...], CombinedMatcher] = {}
+        dispatch = {}
+        for action_type in [*action_types, None]:
+            for target in [*targets, None]:
+                subset = tuple(i for i, rule in enumerate(rules) if rule.applies_to(action_type, target))
+                if subset not in by_subset:
+                    by_subset[subset] = CombinedMatcher([rules[i] for i in subset], validated=True)
+                dispatch[(action_type, target)] = by_subset[subset]
+        return action_types, targets, dispatch
+
+    @classmethod
+    def load(cls, path: str, cache_dir: str | None = None) -> "InnateRuleSet":
+        return cls.load_with_origin(path, cache_dir)[0]
+
+    @classmethod
+    def load_with_origin(cls, path: str, cache_dir: str | None = None) -> tuple["InnateRuleSet", str]:
+        """Load a rules file, returning the set and where it came from.
+
+        The origin is "memo" for a set already compiled in this process,
+        "cache" for one rebuilt from the JSON cache and "compiled" for one
+        parsed from the YAML file itself.
+        """
+        with open(path, "rb") as f:
+            source = f.read()
+        digest = hashlib.sha256(source).hexdigest()
+        with _COMPILED_LOCK:
+            rules = _COMPILED.get(digest)
+            if rules is not None:
+                _COMPILED.move_to_end(digest)
+                return rules, "memo"
+
+        cache_path = cls._cache_path(cache_dir, path) if cache_dir else None
+        config = cls._read_cache(cache_path, digest) if cache_path else None
+        if config is not None:
+            rules, origin = cls(config, validated=True), "cache"
+        else:
+            config = yaml.safe_load(source)
+            rules, origin = cls(config), "compiled"
+            if cache_path:
+                cls._write_cache(cache_path, digest, config)
+
+        with _COMPILED_LOCK:
+            _COMPILED[digest] = rules
+            if len(_COMPILED) > _COMPILED_MAX:
+                _COMPILED.popitem(last=False)
+        return rules, origin
+
+    @staticmethod
+    def _cache_path(cache_dir: str, path: str) -> Path:
+        # One cache file per rules file, so rule sets in different files don't evict each other
+        name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+        return Path(cache_dir) / f"innate_rules-{name}.json"
+
+    @staticmethod
+    def _read_cache(cache_path: Path, digest: str) -> dict | None:
+        try:
+            cached = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("format") != RULES_CACHE_FORMAT:
+            return None
+        if cached.get("sha256") != digest or not isinstance(cached.get("config"), dict):
+            return None
+        return cached["config"]
+
+    @staticmethod
+    def _write_cache(cache_path: Path, digest: str, config: dict):
+        """Best effort: an unwritable cache only costs the next boot a full compile."""
+        try:
+            payload = json.dumps({"format": RULES_CACHE_FORMAT, "sha256": digest, "config": config})
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(payload)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
 
 
 class InnateLayer:
-    def __init__(self, rules_path: str | None = None):
-        if rules_path is None:
-            rules_path = str(Path(__file__).parent / "innate_rules.yaml")
-
-        with open(rules_path) as f:
-            self._config = yaml.safe_load(f)
-
-        self._destructive_patterns = []
-        for entry in self._config.get("destructive_patterns", []):
-            flags = re.IGNORECASE if entry.get("case_insensitive") else 0
-            self._destructive_patterns.append({
-                "pattern": re.compile(entry["pattern"], flags),
-                "category": ThreatCategory(entry["category"]),
-                "reason": entry["reason"],
-            })
-
-        self._scope_patterns = []
-        for entry in self._config.get("scope_violations", []):
-            self._scope_patterns.append({
-                "pattern": re.compile(re.escape(entry["pattern"])),
-                "category": ThreatCategory(entry["category"]),
-                "reason": entry["reason"],
-            })
-
-        loop_cfg = self._config.get("loop_detection", {})
-        self._max_identical = loop_cfg.get("max_identical_actions", 10)
-        self._loop_window = loop_cfg.get("window_seconds", 60)
-        self._action_history: dict[str, list[float]] = defaultdict(list)
+    def __init__(
+        self,
+        rules_path: str | None = None,
+        max_scan_chars: int = 262_144,
+        cache_dir: str | None = None,
+    ):
+        self.rules_path = rules_path or DEFAULT_RULES_PATH
+        # Longer actions are refused unscanned, so no payload makes a check slow
+        self.max_scan_chars = max_scan_chars
+        self.cache_dir = cache_dir
+        self._rules_mtime = self._stat_rules()
+        self._rules, self.loaded_from = InnateRuleSet.load_with_origin(self.rules_path, cache_dir)
+        self._action_history = self._new_loop_counter(self._rules)
+        # Bumped whenever the rules change, so cached verdicts can be discarded
+        self.generation = 0
+
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_reload_ms: float | None = None
+        self.last_reload_error: str | None = None
+        self.last_reloaded_at: datetime | None = None
+        self._watch_task: asyncio.Task | None = None
 
     def check(self, action: AgentAction) -> VigilVerdict:
         start = time.monotonic()
 
-        target = action.target
-        params_str = str(action.parameters)
-        full_text = f"{target} {params_str}"
+        verdict = self.match(action)
+        if verdict:
+            return verdict
 
-        for rule in self._destructive_patterns:
-            if rule["pattern"].search(full_text):
-                elapsed = int((time.monotonic() - start) * 1_000_000) / 1000
-                return VigilVerdict(
-                    approved=False,
-                    category=rule["category"],
-                    layer="innate",
-                    reason=rule["reason"],
-                    latency_ms=max(1, int(elapsed)),
-                )
-
-        for rule in self._scope_patterns:
-            if rule["pattern"].search(full_text):
-                elapsed = int((time.monotonic() - start) * 1_000_000) / 1000
-                return VigilVerdict(
-                    approved=False,
-                    category=rule["category"],
-                    layer="innate",
-                    reason=rule["reason"],
-                    latency_ms=max(1, int(elapsed)),
-                )
-
-        loop_verdict = self._check_looping(action)
+        loop_verdict = self.check_looping(action)
         if loop_verdict:
             return loop_verdict
 
         elapsed = int((time.monotonic() - start) * 1_000_000) / 1000
         return VigilVerdict(approved=True, layer="innate", latency_ms=max(1, int(elapsed)))
 
-    def _check_looping(self, action: AgentAction) -> VigilVerdict | None:
-        key = f"{action.action_type}:{action.target}"
-        now = time.time()
+    def match(self, action: AgentAction) -> VigilVerdict | None:
+        """Check the action against the destructive and scope patterns only.
 
-        self._action_history[key] = [
-            t for t in self._action_history[key]
-            if now - t < self._loop_window
-        ]
-        self._action_history[key].append(now)
+        Depends on nothing but the action's content and the current rules, so
+        the result can be cached for as long as generation is unchanged.
+        """
+        rules = self._rules
+        if rules.is_safe_call(action):
+            return None
+        start = time.monotonic()
+
+        target = action.target
+        params_str = str(action.parameters)
+        full_text = f"{target} {params_str}"
+        if len(full_text) > self.max_scan_chars:
+            return VigilVerdict(
+                approved=False,
+                category=ThreatCategory.COST_RUNAWAY,
+                layer="innate",
+                reason=(
+                    f"Action of {len(full_text):,} characters exceeds "
+                    f"the {self.max_scan_chars:,}-character scan budget"
+                ),
+            )
+
+        rule = rules.matcher_for(action.action_type, target).match(full_text)
+        if rule is None:
+            return None
+        elapsed = int((time.monotonic() - start) * 1_000_000) / 1000
+        return VigilVerdict(
+            approved=False,
+            category=rule.category,
+            layer="innate",
+            reason=rule.reason,
+            latency_ms=max(1, int(elapsed)),
+        )
 
-        if len(self._action_history[key]) >= self._max_identical:
+    def check_looping(self, action: AgentAction) -> VigilVerdict | None:
+        rules = self._rules
+        count = self._action_history.hit(f"{action.action_type}:{action.target}")
+        if count >= rules.max_identical:
             return VigilVerdict(
                 approved=False,
                 category=ThreatCategory.LOOPING,
                 layer="innate",
-                reason=f"Action repeated {len(self._action_history[key])} times in {self._loop_window}s",
+                reason=f"Action repeated {count} times in {rules.loop_window}s",
                 latency_ms=0,
             )
         return None
+
+    def is_safe_call(self, action: AgentAction) -> bool:
+        """A parameterless call to a tool listed in safe_tools."""
+        return self._rules.is_safe_call(action)
+
+    @property
+    def resource_limits(self) -> dict:
+        return self._rules.resource_limits
+
+    def loop_memory_usage(self) -> dict:
+        return self._action_history.memory_usage()
+
+    # -- Hot reload -----------------------------------------------------------
+
+    async def reload(self) -> bool:
+        """Recompile the rules file off the event loop and swap it in.
+
+        An unreadable or invalid file is reported and the current rules stay
+        in force. Returns True if new rules were installed.
+        """
+        start = time.monotonic()
+        mtime = self._stat_rules()
+        try:
+            rules, loaded_from = await asyncio.to_thread(
+                InnateRuleSet.load_with_origin, self.rules_path, self.cache_dir,
+            )
+        except Exception as e:
+            self.reload_failures += 1
+            self.last_reload_error = f"{type(e).__name__}: {e}"
+            # Don't retry the same broken file on every poll
+            self._rules_mtime = mtime
+            return False
+
+        current = self._rules
+        if (rules.max_identical, rules.loop_window, rules.max_tracked_keys) != (
+            current.max_identical, current.loop_window, current.max_tracked_keys,
+        ):
+            self._action_history = self._new_loop_counter(rules)
+        self._rules = rules
+        self.loaded_from = loaded_from
+        self._rules_mtime = mtime
+        self.generation += 1
+
+        self.reloads += 1
+        self.last_reload_ms = (time.monotonic() - start) * 1000
+        self.last_reload_error = None
+        self.last_reloaded_at = datetime.utcnow()
+        return True
+
+    async def reload_if_changed(self) -> bool:
+        if self._stat_rules() == self._rules_mtime:
+            return False
+        return await self.reload()
+
+    def start_watching(self, interval_seconds: float = 5.0):
+        """Poll the rules file's mtime and reload it whenever it changes."""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch(interval_seconds))
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def reload_stats(self) -> dict:
+        return {
+            "rules_path": self.rules_path,
+            "generation": self.generation,
+            "loaded_from": self.loaded_from,
+            "reloads": self.reloads,
+            "failures": self.reload_failures,
+            "last_reload_ms": self.last_reload_ms,
+            "last_reloaded_at": self.last_reloaded_at.isoformat() if self.last_reloaded_at else None,
+            "last_error": self.last_reload_error,
+        }
+
+    async def _watch(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.reload_if_changed()
+
+    def _stat_rules(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.rules_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _new_loop_counter(rules: InnateRuleSet) -> SlidingWindowCounter:
+        return SlidingWindowCounter(
+            max_events=rules.max_identical,
+            window_seconds=rules.loop_window,
+            max_keys=rules.max_tracked_keys,
+        )
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+
+from romulus.llm.client import OllamaClient
+from romulus.llm.prompts import VIGIL_JUDGE_PROMPT
+from romulus.models.actions import AgentAction
+from romulus.models.vigil import ThreatCategory, VigilVerdict
+
+_SEVERE = {"high", "critical"}
+
+
+class JudgeLayer:
+    """Asks the LLM whether a gray-zone action is safe, within a deadline.
+
+    Only actions the rule layers cannot settle go to the judge: irreversible
+    actions and those of the configured action types, except tool calls
+    without arguments, which run fixed code. Each call gets a hard
+    deadline of timeout_seconds, and at most max_concurrent calls run at
+    once; an action arriving while every slot is busy is not queued. Either
+    way the fallback applies: fail_closed refuses the action as UNVERIFIED
+    (so it never becomes a memory cell), otherwise it passes.
+
+    The prompt carries only the action, never the task, so a verdict
+    depends on the action's content and is cached by its fingerprint.
+    Fallbacks and unparseable answers are not cached.
+    """
+
+    def __init__(
+        self,
+        llm: OllamaClient,
+        timeout_seconds: float = 2.0,
+        fail_closed: bool = False,
+        max_concurrent: int = 2,
+        cache_size: int = 1024,
+        action_types: tuple[str, ...] = ("shell", "tool_call"),
+    ):
+        self.llm = llm
+        self.timeout_seconds = timeout_seconds
+        self.fail_closed = fail_closed
+        self.max_concurrent = max_concurrent
+        self.cache_size = cache_size
+        self.action_types = frozenset(action_types)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._cache: OrderedDict[bytes, VigilVerdict | None] = OrderedDict()
+        self._inflight: dict[bytes, asyncio.Future] = {}
+        self.calls = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.saturated = 0
+        self.errors = 0
+        self.last_latency_ms = 0
+
+    def is_gray(self, action: AgentAction) -> bool:
+        if not action.reversible:
+            return True
+        if action.action_type not in self.action_types:
+            return False
+        return action.action_type != "tool_call" or bool(action.parameters)
+
+    async def check(self, action: AgentAction, key: bytes) -> VigilVerdict | None:
+        """Return a blocking verdict, or None if the action may proceed."""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._cache[key]
+
+        # Identical actions judged concurrently share one call
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.cache_hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                return self._fallback("judge call cancelled")
+
+        if self._slots.locked():
+            self.saturated += 1
+            return self._fallback("all judge slots busy")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            verdict = await self._judge(action, key)
+            future.set_result(verdict)
+            return verdict
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "timeouts": self.timeouts,
+            "saturated": self.saturated,
+            "errors": self.errors,
+            "last_latency_ms": self.last_latency_ms,
+        }
+
+    async def _judge(self, action: AgentAction, key: bytes) -> VigilVerdict | None:
+        prompt = VIGIL_JUDGE_PROMPT.format(
+            action_type=action.action_type,
+            target=action.target,
+            parameters=json.dumps(action.parameters, default=str),
+            task="(not provided)",
+            confidence="(not provided)",
+        )
+        async with self._slots:
+            self.calls += 1
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self.llm.generate(prompt, temperature=0.0, max_tokens=128),
+                    self.timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return self._fallback(f"timed out after {self.timeout_seconds:g}s")
+            except Exception as e:
+                self.errors += 1
+                return self._fallback(f"{type(e).__name__}: {e}")
+            finally:
+                self.last_latency_ms = int((time.monotonic() - start) * 1000)
+
+        ruling = self._parse_ruling(response.text)
+        if ruling is None:
+            self.errors += 1
+            return self._fallback("unreadable ruling")
+
+        verdict = None
+        if not ruling["safe"]:
+            verdict = VigilVerdict(
+                approved=False,
+                category=ThreatCategory.DESTRUCTIVE if ruling["risk_level"] in _SEVERE else ThreatCategory.SCOPE_ESCAPE,
+                layer="judge",
+                reason=f"Safety judge ({ruling['risk_level']} risk): {ruling['reason']}",
+            )
+        if self.cache_size > 0:
+            self._cache[key] = verdict
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return verdict
+
+    def _fallback(self, why: str) -> VigilVerdict | None:
+        if not self.fail_closed:
+            return None
+        return VigilVerdict(
+            approved=False,
+            category=ThreatCategory.UNVERIFIED,
+            layer="judge",
+            reason=f"Safety judge unavailable ({why})",
+        )
+
+    def _parse_ruling(self, text: str) -> dict | None:
+        json_match = re.search(r"```(?:json)?\s*([\s\S]*?)```", text)
+        json_text = json_match.group(1).strip() if json_match else text.strip()
+        start = json_text.find("{")
+        end = json_text.rfind("}") + 1
+        if start >= 0 and end > start:
+            json_text = json_text[start:end]
+        try:
+            data = json.loads(json_text)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("safe"), bool):
+            return None
+        return {
+            "safe": data["safe"],
+            "reason": str(data.get("reason", "")),
+            "risk_level": str(data.get("risk_level", "unknown")).lower(),
+        }
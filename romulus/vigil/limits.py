@@ -0,0 +1,140 @@
+import time
+from typing import Callable
+
+from romulus.models.actions import AgentAction
+from romulus.models.vigil import ThreatCategory, VigilVerdict
+
+
+class TokenBucket:
+    """Classic token bucket refilled lazily from the elapsed time.
+
+    Holds up to one minute's allowance, so a quiet agent can burst to the
+    full per-minute limit and is then held to the steady rate.
+    """
+
+    __slots__ = ("per_minute", "tokens", "updated")
+
+    def __init__(self, per_minute: float, now: float):
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.per_minute, self.tokens + elapsed * self.per_minute / 60.0)
+            self.updated = now
+        return self.tokens
+
+    def consume(self, amount: float, now: float) -> bool:
+        if self.refill(now) < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+    def charge(self, amount: float, now: float):
+        """Take tokens unconditionally; the bucket may go into debt."""
+        self.refill(now)
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """Admission control for agent actions and LLM token spend.
+
+    Every action takes one token from its agent's action bucket and, if a
+    limit is configured for its action type, from that agent's bucket for
+    the type. LLM usage is charged after the fact with record_tokens(); an
+    agent whose token bucket is in debt has further actions refused until
+    it refills. Refusals are COST_RUNAWAY verdicts. All checks are O(1).
+
+    The constructor's limits are fallbacks; configure() applies the
+    resource_limits section of the innate rules over them.
+    """
+
+    def __init__(
+        self,
+        max_actions_per_minute: int = 30,
+        max_tokens_per_minute: int = 10_000,
+        action_type_limits: dict[str, int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._defaults = (max_actions_per_minute, max_tokens_per_minute)
+        self.max_actions_per_minute = max_actions_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.action_type_limits = action_type_limits or {}
+        self._clock = clock
+        self._action_buckets: dict[str, TokenBucket] = {}
+        self._type_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._token_buckets: dict[str, TokenBucket] = {}
+
+    def configure(self, resource_limits: dict):
+        """Apply a resource_limits section, keeping existing buckets' balances.
+
+        Limits missing from the section fall back to the constructor's.
+        A bucket whose limit went down keeps at most the new allowance.
+        """
+        self.max_actions_per_minute = resource_limits.get("max_actions_per_minute", self._defaults[0])
+        self.max_tokens_per_minute = resource_limits.get("max_tokens_per_minute", self._defaults[1])
+        self.action_type_limits = dict(resource_limits.get("action_types") or {})
+
+        for bucket in self._action_buckets.values():
+            bucket.per_minute = self.max_actions_per_minute
+            bucket.tokens = min(bucket.tokens, bucket.per_minute)
+        for bucket in self._token_buckets.values():
+            bucket.per_minute = self.max_tokens_per_minute
+            bucket.tokens = min(bucket.tokens, bucket.per_minute)
+        for key, bucket in list(self._type_buckets.items()):
+            limit = self.action_type_limits.get(key[1])
+            if limit is None:
+                del self._type_buckets[key]
+            else:
+                bucket.per_minute = limit
+                bucket.tokens = min(bucket.tokens, limit)
+
+    def admit(self, action: AgentAction) -> VigilVerdict | None:
+        """Return a COST_RUNAWAY verdict if the action is over any limit."""
+        now = self._clock()
+        agent = action.agent_id
+
+        tokens = self._token_bucket(agent, now)
+        if tokens.refill(now) <= 0:
+            return self._refuse(f"LLM token budget of {self.max_tokens_per_minute}/min exhausted")
+
+        actions = self._action_buckets.get(agent)
+        if actions is None:
+            actions = self._action_buckets[agent] = TokenBucket(self.max_actions_per_minute, now)
+        type_limit = self.action_type_limits.get(action.action_type)
+        by_type = None
+        if type_limit is not None:
+            by_type = self._type_buckets.get((agent, action.action_type))
+            if by_type is None:
+                by_type = self._type_buckets[(agent, action.action_type)] = TokenBucket(type_limit, now)
+
+        # Check both scopes before taking from either, so a refusal costs nothing
+        if actions.refill(now) < 1:
+            return self._refuse(f"Action rate limit of {self.max_actions_per_minute}/min exceeded")
+        if by_type is not None:
+            if by_type.refill(now) < 1:
+                return self._refuse(f"Rate limit of {type_limit}/min for {action.action_type} actions exceeded")
+            by_type.tokens -= 1
+        actions.tokens -= 1
+        return None
+
+    def record_tokens(self, agent_id: str, tokens: int):
+        now = self._clock()
+        self._token_bucket(agent_id, now).charge(tokens, now)
+
+    def _token_bucket(self, agent_id: str, now: float) -> TokenBucket:
+        bucket = self._token_buckets.get(agent_id)
+        if bucket is None:
+            bucket = self._token_buckets[agent_id] = TokenBucket(self.max_tokens_per_minute, now)
+        return bucket
+
+    @staticmethod
+    def _refuse(reason: str) -> VigilVerdict:
+        return VigilVerdict(
+            approved=False,
+            category=ThreatCategory.COST_RUNAWAY,
+            layer="rate_limit",
+            reason=reason,
+        )
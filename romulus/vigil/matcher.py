@@ -0,0 +1,231 @@
+import re
+import re._constants as sre
+import re._parser as sre_parse
+
+from romulus.models.vigil import ThreatCategory
+from romulus.vigil.automaton import AhoCorasick
+
+# Characters standing in for "any character" when comparing character sets
+_ALPHABET = frozenset(map(chr, range(128))) | {"\u00e9", "\u00a0"}
+_CATEGORIES = {
+    sre.CATEGORY_DIGIT: r"\d", sre.CATEGORY_NOT_DIGIT: r"\D",
+    sre.CATEGORY_SPACE: r"\s", sre.CATEGORY_NOT_SPACE: r"\S",
+    sre.CATEGORY_WORD: r"\w", sre.CATEGORY_NOT_WORD: r"\W",
+}
+_REPEATS = (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT)
+
+
+def _char_set(op, av) -> frozenset[str] | None:
+    """Characters a single-character node can match, or None for other nodes."""
+    if op is sre.LITERAL:
+        c = chr(av)
+        return frozenset({c, c.lower(), c.upper()})
+    if op is sre.NOT_LITERAL:
+        return _ALPHABET - {chr(av)}
+    if op is sre.ANY:
+        return _ALPHABET - {"\n"}
+    if op is sre.IN:
+        chars = set()
+        negate = False
+        for item_op, item_av in av:
+            if item_op is sre.NEGATE:
+                negate = True
+            elif item_op is sre.CATEGORY:
+                chars |= {c for c in _ALPHABET if re.fullmatch(_CATEGORIES.get(item_av, "."), c, re.S)}
+            elif item_op is sre.RANGE:
+                chars |= {c for c in _ALPHABET if item_av[0] <= ord(c) <= item_av[1]}
+            else:
+                chars |= _char_set(item_op, item_av) or set()
+        return frozenset(_ALPHABET - chars if negate else chars)
+    return None
+
+
+def _children(op, av) -> list:
+    if op in _REPEATS:
+        return [av[2]]
+    if op is sre.SUBPATTERN:
+        return [av[3]]
+    if op is sre.BRANCH:
+        return list(av[1])
+    if op in (sre.ASSERT, sre.ASSERT_NOT):
+        return [av[1]]
+    if op is sre.ATOMIC_GROUP:
+        return [av]
+    return []
+
+
+def _first(items) -> tuple[set[str], bool]:
+    """Characters a sequence can start with, and whether it can match empty."""
+    first: set[str] = set()
+    for op, av in items:
+        chars = _char_set(op, av)
+        if chars is not None:
+            return first | chars, False
+        if op in _REPEATS:
+            sub_first, sub_empty = _first(av[2])
+            first |= sub_first
+            if not (sub_empty or av[0] == 0):
+                return first, False
+        elif op in (sre.SUBPATTERN, sre.ATOMIC_GROUP):
+            sub_first, sub_empty = _first(_children(op, av)[0])
+            first |= sub_first
+            if not sub_empty:
+                return first, False
+        elif op is sre.BRANCH:
+            empty = False
+            for branch in av[1]:
+                sub_first, sub_empty = _first(branch)
+                first |= sub_first
+                empty |= sub_empty
+            if not empty:
+                return first, False
+        elif op is sre.GROUPREF:
+            first |= _ALPHABET
+        # Anchors and lookarounds consume nothing
+    return first, True
+
+
+def _all_chars(items) -> set[str]:
+    chars: set[str] = set()
+    for op, av in items:
+        own = _char_set(op, av)
+        if own is not None:
+            chars |= own
+        for child in _children(op, av):
+            chars |= _all_chars(child)
+    return chars
+
+
+def _unbounded_repeats(items, following=()):
+    """Yield each greedy unbounded repeat's body with the sequences that follow it."""
+    for i, (op, av) in enumerate(items):
+        after = (items[i + 1:], *following)
+        if op in _REPEATS and av[1] is sre.MAXREPEAT and op is not sre.POSSESSIVE_REPEAT:
+            yield av[2], after
+        for child in _children(op, av):
+            yield from _unbounded_repeats(child, after)
+
+
+def _has_backreference(items) -> bool:
+    for op, av in items:
+        if op is sre.GROUPREF or op is sre.GROUPREF_EXISTS:
+            return True
+        if any(_has_backreference(child) for child in _children(op, av)):
+            return True
+    return False
+
+
+def check_backtracking(pattern: str):
+    """Reject patterns whose nested quantifiers can backtrack exponentially.
+
+    Inside an unbounded repeat, an inner unbounded repeat is ambiguous when
+    it can consume the first character of the next outer iteration and
+    nothing in between forces it to stop: (a+)+, (\\w+\\s?)* and (.*a)* can
+    split the same run of input between iterations in exponentially many
+    ways. A delimiter the inner repeat cannot consume, as in (-[a-z]*f)+ or
+    (\\w+,)+, keeps the split unique, so those are accepted.
+    """
+    for body, _ in _unbounded_repeats(sre_parse.parse(pattern).data):
+        body_first, body_empty = _first(body)
+        for inner, following in _unbounded_repeats(body):
+            inner_chars = _all_chars(inner)
+            next_first, next_empty = _first([item for seq in following for item in seq])
+            if body_empty or (inner_chars & body_first and (next_empty or next_first & inner_chars)):
+                raise ValueError(f"Innate rule {pattern!r} has nested quantifiers prone to catastrophic backtracking")
+
+
+class InnateRule:
+    def __init__(
+        self,
+        pattern: str,
+        category: ThreatCategory,
+        reason: str,
+        case_insensitive: bool = False,
+        literal: bool = False,
+        action_types: list[str] | None = None,
+        targets: list[str] | None = None,
+    ):
+        self.pattern = pattern
+        self.category = category
+        self.reason = reason
+        self.case_insensitive = case_insensitive
+        self.literal = literal
+        # None means the rule applies to every action type / target
+        self.action_types = frozenset(action_types) if action_types else None
+        self.targets = frozenset(targets) if targets else None
+
+    def applies_to(self, action_type: str | None, target: str | None) -> bool:
+        """Whether the rule covers an action; None stands for any untagged type or target."""
+        if self.action_types is not None and action_type not in self.action_types:
+            return False
+        return self.targets is None or target in self.targets
+
+    @property
+    def regex(self) -> str:
+        source = re.escape(self.pattern) if self.literal else self.pattern
+        return f"(?i:{source})" if self.case_insensitive else source
+
+
+class CombinedMatcher:
+    """All innate rules compiled into one scan regex plus, past
+    AUTOMATON_MIN_LITERALS literals, Aho-Corasick automata.
+
+    The lowest-index matching rule wins, as if the rules were tried in
+    order. The whole text is scanned, so a match may be of any length.
+    """
+
+    AUTOMATON_MIN_LITERALS = 128
+
+    def __init__(self, rules: list[InnateRule], validated: bool = False):
+        self.rules = rules
+        self._priority: dict[str, int] = {}
+        self._literals = AhoCorasick()
+        self._folded_literals = AhoCorasick()
+        use_automaton = sum(rule.literal for rule in rules) >= self.AUTOMATON_MIN_LITERALS
+        scan_branches = []
+        named_branches = []
+        for i, rule in enumerate(rules):
+            if rule.literal and use_automaton:
+                if rule.case_insensitive:
+                    self._folded_literals.add(rule.pattern.lower(), i)
+                else:
+                    self._literals.add(rule.pattern, i)
+                continue
+            if not validated:
+                check_backtracking(rule.regex)
+                if re.compile(rule.regex).groupindex:
+                    raise ValueError(f"Innate rule {rule.pattern!r} must not use named groups")
+                # Group numbers shift once the rule sits behind others in the alternation
+                if _has_backreference(sre_parse.parse(rule.regex).data):
+                    raise ValueError(f"Innate rule {rule.pattern!r} must not use backreferences")
+            name = f"_r{i}"
+            self._priority[name] = i
+            scan_branches.append(f"(?:{rule.regex})")
+            named_branches.append(f"(?P<{name}>{rule.regex})")
+        self._scan = re.compile("|".join(scan_branches)) if scan_branches else None
+        self._named = re.compile("|".join(named_branches)) if named_branches else None
+
+    def match(self, text: str) -> InnateRule | None:
+        best = len(self.rules)
+        if self._literals:
+            found = self._literals.find(text)
+            if found is not None:
+                best = found
+        if self._folded_literals:
+            found = self._folded_literals.find(text.lower())
+            if found is not None and found < best:
+                best = found
+
+        if self._scan is not None:
+            # At any position, alternation picks the lowest-index rule matching there.
+            # Resuming one character after each match start visits every position
+            # where some rule matches, so the minimum over them is the global winner.
+            search, identify = self._scan.search, self._named.match
+            pos = 0
+            while best and (m := search(text, pos)) is not None:
+                hit = identify(text, m.start())
+                if hit is not None and self._priority[hit.lastgroup] < best:
+                    best = self._priority[hit.lastgroup]
+                pos = m.start() + 1
+
+        return self.rules[best] if best < len(self.rules) else None
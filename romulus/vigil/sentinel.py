@@ -1,25 +1,146 @@
+import hashlib
+import json
+from collections import OrderedDict
+
 from romulus.models.actions import AgentAction
 from romulus.models.vigil import VigilVerdict
-from romulus.vigil.adaptive import AdaptiveLayer
+from romulus.vigil.adaptive import AdaptiveLayer, MemoryCell
+from romulus.vigil.anomaly import AnomalyDetector
 from romulus.vigil.incidents import IncidentLogger
 from romulus.vigil.innate import InnateLayer
+from romulus.vigil.judge import JudgeLayer
+from romulus.vigil.limits import RateLimiter
+
+
+def fingerprint(action: AgentAction) -> bytes:
+    """Digest of an action's content, independent of parameter order."""
+    canonical = json.dumps(
+        [action.action_type, action.target, action.parameters], sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
 
 
 class Sentinel:
-    def __init__(self, innate: InnateLayer, adaptive: AdaptiveLayer, incident_logger: IncidentLogger):
+    """Runs actions through rate limits, innate rules, adaptive memory and the judge.
+
+    Content verdicts are cached by action fingerprint until either rule
+    layer's generation moves; rate limits and loop detection are not.
+    """
+
+    def __init__(
+        self,
+        innate: InnateLayer,
+        adaptive: AdaptiveLayer,
+        incident_logger: IncidentLogger,
+        rate_limiter: RateLimiter | None = None,
+        cache_size: int = 4096,
+        judge: JudgeLayer | None = None,
+        anomaly: AnomalyDetector | None = None,
+    ):
         self.innate = innate
         self.adaptive = adaptive
         self.incident_logger = incident_logger
+        self.rate_limiter = rate_limiter
+        self.judge = judge
+        self.anomaly = anomaly
+        self.cache_size = cache_size
+        # Adaptive results are cached as the matching cell, so a cached hit still counts
+        self._cache: OrderedDict[bytes, tuple[VigilVerdict | None, MemoryCell | None]] = OrderedDict()
+        self._cache_generation = (innate.generation, adaptive.generation)
+        self._limits_generation = innate.generation
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     async def evaluate(self, action: AgentAction) -> VigilVerdict:
-        verdict = self.innate.check(action)
+        verdict = await self._judge(action, cache=self.cache_size > 0)
         if not verdict.approved:
             await self.incident_logger.log(action, verdict)
-            return verdict
+        return verdict
 
-        verdict = await self.adaptive.check(action)
-        if not verdict.approved:
-            await self.incident_logger.log(action, verdict)
+    async def evaluate_many(self, actions: list[AgentAction]) -> list[VigilVerdict]:
+        """Evaluate a batch of actions, returning verdicts in the same order.
+
+        Verdicts are exactly those of calling evaluate() on each action in
+        turn: rate limits, loop counts and adaptive learning apply in order,
+        so a block early in the batch can block a later action. Each action
+        is fingerprinted once, repeats within the batch are served from the
+        verdict cache, and all incidents are logged in one transaction.
+        """
+        verdicts = []
+        for action in actions:
+            verdicts.append(await self._judge(action, cache=True))
+
+        incidents = [(action, verdict) for action, verdict in zip(actions, verdicts) if not verdict.approved]
+        if incidents:
+            await self.incident_logger.log_many(incidents)
+        return verdicts
+
+    async def _judge(self, action: AgentAction, cache: bool) -> VigilVerdict:
+        if self.rate_limiter is not None:
+            if self._limits_generation != self.innate.generation:
+                self.rate_limiter.configure(self.innate.resource_limits)
+                self._limits_generation = self.innate.generation
+            refusal = self.rate_limiter.admit(action)
+            if refusal is not None:
+                return refusal
+
+        if self.innate.is_safe_call(action):
+            # Nothing to scan or fingerprint; only repetition can be wrong with it
+            return self.innate.check_looping(action) or VigilVerdict(approved=True, layer="all_clear")
+
+        key = fingerprint(action) if cache else None
+        innate_verdict, adaptive_verdict = await self._content_verdicts(action, key)
+        verdict = innate_verdict or self.innate.check_looping(action) or adaptive_verdict
+        if verdict is None and self.judge is not None and self.judge.is_gray(action):
+            verdict = await self.judge.check(action, key if key is not None else fingerprint(action))
+        if verdict is not None:
+            # Learn before the incident is logged: with a started logger the write happens later
+            self.adaptive.learn(action, verdict)
             return verdict
 
         return VigilVerdict(approved=True, layer="all_clear")
+
+    async def _content_verdicts(
+        self, action: AgentAction, key: bytes | None,
+    ) -> tuple[VigilVerdict | None, VigilVerdict | None]:
+        generation = (self.innate.generation, self.adaptive.generation)
+        if generation != self._cache_generation:
+            self._cache.clear()
+            self._cache_generation = generation
+
+        cached = self._cache.get(key) if key is not None else None
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            innate_verdict, cell = cached
+        else:
+            self.cache_misses += 1
+            innate_verdict = self.innate.match(action)
+            cell = self.adaptive.match(action) if innate_verdict is None else None
+            if key is not None:
+                self._cache[key] = (innate_verdict, cell)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return innate_verdict, self.adaptive.record_hit(cell) if cell is not None else None
+
+    def record_tokens(self, agent_id: str, tokens: int):
+        """Charge LLM tokens spent on behalf of an agent against its budget."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_tokens(agent_id, tokens)
+
+    async def observe_response(
+        self, agent_id: str, decision: str, confidence: float, latency_ms: int, tokens: int,
+        known: bool = True,
+    ) -> list[VigilVerdict]:
+        """Run an LLM response past the anomaly detector and log what it flags."""
+        if self.anomaly is None:
+            return []
+        flags = self.anomaly.observe(decision, confidence, latency_ms, tokens, known)
+        if flags:
+            action = AgentAction(
+                action_type="llm_response", target=decision, agent_id=agent_id,
+                parameters={"confidence": confidence, "latency_ms": latency_ms, "tokens": tokens},
+            )
+            await self.incident_logger.log_many([(action, flag) for flag in flags])
+        return flags
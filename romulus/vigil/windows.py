@@ -0,0 +1,86 @@
+import hashlib
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable
+
+
+class SlidingWindowCounter:
+    """Per-key event counts over a sliding time window, in bounded memory.
+
+    Each key keeps a deque of its most recent timestamps, capped at
+    max_events since nothing beyond the threshold is ever needed. Keys are
+    stored as 8-byte digests, so long targets cost no more than short ones,
+    and are ordered by last use: keys idle for a whole window are dropped
+    from the front as new hits arrive, and once max_keys are tracked the
+    least recently used key is evicted. Every operation is O(1) amortized.
+    """
+
+    def __init__(
+        self,
+        max_events: int,
+        window_seconds: float,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_events = max_events
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._clock = clock
+        self._windows: OrderedDict[bytes, deque[float]] = OrderedDict()
+        self._events = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def hit(self, key: str) -> int:
+        """Record an event for key and return how many fall inside the window."""
+        now = self._clock()
+        cutoff = now - self.window_seconds
+        windows = self._windows
+        self._expire(cutoff)
+
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        events = windows.get(digest)
+        if events is None:
+            events = windows[digest] = deque(maxlen=self.max_events)
+            if len(windows) > self.max_keys:
+                _, dropped = windows.popitem(last=False)
+                self._events -= len(dropped)
+                self.evicted += 1
+        else:
+            windows.move_to_end(digest)
+            while events and events[0] <= cutoff:
+                events.popleft()
+                self._events -= 1
+
+        if len(events) == self.max_events:
+            self._events -= 1
+        events.append(now)
+        self._events += 1
+        return len(events)
+
+    def _expire(self, cutoff: float):
+        # Keys are in last-use order, so idle ones are all at the front
+        windows = self._windows
+        while windows:
+            digest, events = next(iter(windows.items()))
+            if events and events[-1] > cutoff:
+                break
+            del windows[digest]
+            self._events -= len(events)
+            self.evicted += 1
+
+    def memory_usage(self) -> dict:
+        """Tracked keys and events with an approximate byte footprint."""
+        keys = len(self._windows)
+        per_key = sys.getsizeof(deque(maxlen=self.max_events)) + sys.getsizeof(b"12345678") + 3 * 8
+        approx_bytes = sys.getsizeof(self._windows) + keys * per_key + self._events * sys.getsizeof(0.0)
+        return {
+            "keys": keys,
+            "max_keys": self.max_keys,
+            "events": self._events,
+            "evicted": self.evicted,
+            "approx_bytes": approx_bytes,
+        }
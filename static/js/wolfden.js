@@ -302,8 +302,8 @@
                 items.push({
                     type: 'vigil',
                     text: `Vigil: ${reason}${inc.task ? ' — ' + inc.task : ''}`,
-                    time: inc.timestamp,
-                    sortTime: new Date(inc.timestamp).getTime(),
+                    time: inc.last_seen || inc.timestamp,
+                    sortTime: new Date(inc.last_seen || inc.timestamp).getTime(),
                 });
             });
         }
@@ -423,10 +423,11 @@
         if (state.isDreaming) {
             setWolfState('dreaming');
         } else if (state.incidents && state.incidents.length > 0) {
-            // Check if there are recent incidents (last 5 minutes)
+            // Check if there are recent incidents (last 5 minutes); an
+            // aggregated incident's timestamp is its first event, last_seen its latest
             const now = Date.now();
             const recent = state.incidents.some((inc) => {
-                const t = new Date(inc.timestamp).getTime();
+                const t = new Date(inc.last_seen || inc.timestamp).getTime();
                 return (now - t) < 300000; // 5 minutes
             });
             if (recent) {
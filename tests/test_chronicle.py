@@ -1,12 +1,16 @@
 """Tests for the Chronicle memory system (database, episodic, semantic, identity stores)."""
 
+import random
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
+import aiosqlite
 import pytest
 
 from romulus.chronicle.database import ChronicleDB
 from romulus.chronicle.episodic import EpisodicStore
-from romulus.chronicle.identity import IdentityStore
+from romulus.chronicle.identity import IdentityStore, trust_score
+from romulus.chronicle.rule_index import RuleIndex, decayed_confidence
 from romulus.chronicle.semantic import SemanticStore
 from romulus.models.episodic import EpisodicTrace
 from romulus.models.semantic import SemanticRule
@@ -108,6 +112,25 @@ class TestChronicleDB:
         )
         assert row_id == "test-id"
 
+    async def test_transaction_commits(self, db):
+        async with db.transaction() as conn:
+            await conn.execute(
+                "INSERT INTO semantic_rules (id, rule, confidence, last_validated) VALUES (?, ?, ?, ?)",
+                ("r-1", "rule", 0.5, datetime.utcnow().isoformat()),
+            )
+        rows = await db.execute("SELECT id FROM semantic_rules")
+        assert [r["id"] for r in rows] == ["r-1"]
+
+    async def test_transaction_rolls_back_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            async with db.transaction() as conn:
+                await conn.execute(
+                    "INSERT INTO semantic_rules (id, rule, confidence, last_validated) VALUES (?, ?, ?, ?)",
+                    ("r-1", "rule", 0.5, datetime.utcnow().isoformat()),
+                )
+                raise RuntimeError("boom")
+        assert await db.execute("SELECT id FROM semantic_rules") == []
+
 
 # ---------------------------------------------------------------------------
 # EpisodicStore
@@ -391,6 +414,318 @@ class TestSemanticStore:
         assert retrieved.source_episode_ids == ["ep-1", "ep-2", "ep-3"]
 
 
+    async def test_select_rules_ranks_by_relevance(self, semantic_store):
+        await semantic_store.add_rule(
+            SemanticRule(rule="When asked about math, use the calculate tool", confidence=0.8),
+        )
+        await semantic_store.add_rule(SemanticRule(rule="When asked the time, use the get_time tool", confidence=0.9))
+        await semantic_store.add_rule(SemanticRule(rule="Keep greetings short and friendly", confidence=0.95))
+
+        rules = await semantic_store.select_rules("Can you do some math for me?", limit=5)
+        assert [r.rule for r in rules] == ["When asked about math, use the calculate tool"]
+
+    async def test_select_rules_tracks_mutations(self, semantic_store):
+        rule = SemanticRule(rule="Prefer metric units for weather", confidence=0.7, evidence_count=1)
+        await semantic_store.add_rule(rule)
+        assert len(await semantic_store.select_rules("weather today")) == 1
+
+        # Index is built now; later inserts and deletions must be reflected incrementally
+        other = SemanticRule(rule="Check the weather radar before answering", confidence=0.8)
+        await semantic_store.add_rule(other)
+        assert len(await semantic_store.select_rules("weather today")) == 2
+
+        await semantic_store.invalidate_rule(rule.id)
+        await semantic_store.invalidate_rule(rule.id)
+        selected = await semantic_store.select_rules("weather today")
+        assert [r.id for r in selected] == [other.id]
+
+    async def test_add_duplicate_rule_merges(self, semantic_store):
+        original = SemanticRule(
+            rule="When asked the time, use get_time.", confidence=0.7,
+            evidence_count=2, source_episode_ids=["ep-1", "ep-2"],
+        )
+        await semantic_store.add_rule(original)
+
+        duplicate = SemanticRule(
+            rule="when asked the time use get_time", confidence=0.9,
+            evidence_count=3, source_episode_ids=["ep-2", "ep-3"],
+        )
+        stored_id = await semantic_store.add_rule(duplicate)
+
+        assert stored_id == original.id
+        assert await semantic_store.count_rules() == 1
+        merged = await semantic_store.get_rule(original.id)
+        assert merged.evidence_count == 5
+        assert merged.confidence == 0.9
+        assert merged.source_episode_ids == ["ep-1", "ep-2", "ep-3"]
+
+    async def test_add_near_duplicate_rule_merges(self, semantic_store):
+        await semantic_store.add_rule(SemanticRule(
+            rule="When the user asks for arithmetic, call the calculate tool with the expression",
+            confidence=0.8,
+        ))
+        await semantic_store.add_rule(SemanticRule(
+            rule="If the user asks for arithmetic, call the calculate tool with the full expression",
+            confidence=0.8,
+        ))
+        assert await semantic_store.count_rules() == 1
+
+    @pytest.mark.parametrize("first, second", [
+        ("Do not send email to external recipients without confirming the address first",
+         "Send email to external recipients without confirming the address first"),
+        ("Always ask before deleting files in the shared folder",
+         "Never ask before deleting files in the shared folder"),
+        ("Don't retry failed uploads more than twice", "Retry failed uploads more than twice"),
+    ])
+    async def test_opposite_rules_not_merged(self, semantic_store, first, second):
+        kept = SemanticRule(rule=first, confidence=0.6, evidence_count=2)
+        await semantic_store.add_rule(kept)
+        await semantic_store.add_rule(SemanticRule(rule=second, confidence=0.9))
+        assert await semantic_store.count_rules() == 2
+        stored = await semantic_store.get_rule(kept.id)
+        assert (stored.confidence, stored.evidence_count) == (0.6, 2)
+
+    async def test_duplicate_in_other_domain_not_merged(self, semantic_store):
+        await semantic_store.add_rule(SemanticRule(rule="Keep answers short", confidence=0.8))
+        await semantic_store.add_rule(SemanticRule(rule="Keep answers short", confidence=0.8, domain="email"))
+        assert await semantic_store.count_rules() == 2
+
+    async def test_distinct_rules_not_merged(self, semantic_store):
+        await semantic_store.add_rule(SemanticRule(rule="Use the calculate tool for arithmetic", confidence=0.8))
+        await semantic_store.add_rule(SemanticRule(rule="Use the get_time tool for clock questions", confidence=0.8))
+        assert await semantic_store.count_rules() == 2
+
+    async def test_add_rules_batch(self, semantic_store):
+        rules = [SemanticRule(rule=f"Batch rule about topic{i}", confidence=0.7) for i in range(3)]
+        rules.append(SemanticRule(rule="batch rule about TOPIC1!", confidence=0.9))
+
+        stored_ids = await semantic_store.add_rules(rules)
+
+        assert stored_ids == [rules[0].id, rules[1].id, rules[2].id, rules[1].id]
+        assert await semantic_store.count_rules() == 3
+        merged = await semantic_store.get_rule(rules[1].id)
+        assert merged.evidence_count == 2
+        assert merged.confidence == 0.9
+
+    async def test_add_rules_uses_one_connection(self, semantic_store):
+        await semantic_store.select_rules("warm up the index")
+        rules = [SemanticRule(rule=f"Distinct rule token{i}", confidence=0.7) for i in range(1000)]
+
+        with patch("romulus.chronicle.database.aiosqlite.connect", wraps=aiosqlite.connect) as connect:
+            await semantic_store.add_rules(rules)
+
+        assert connect.call_count == 1
+        assert await semantic_store.count_rules() == 1000
+
+    async def test_validate_rules_batch(self, semantic_store):
+        a = SemanticRule(rule="alpha", confidence=0.7, evidence_count=1)
+        b = SemanticRule(rule="beta", confidence=0.7, evidence_count=4)
+        await semantic_store.add_rules([a, b])
+
+        await semantic_store.validate_rules([a.id, b.id])
+
+        assert (await semantic_store.get_rule(a.id)).evidence_count == 2
+        assert (await semantic_store.get_rule(b.id)).evidence_count == 5
+
+    async def test_invalidate_rules_batch(self, semantic_store):
+        weak = SemanticRule(rule="weak", confidence=0.7, evidence_count=0)
+        strong = SemanticRule(rule="strong", confidence=0.7, evidence_count=3)
+        await semantic_store.add_rules([weak, strong])
+
+        deleted = await semantic_store.invalidate_rules([weak.id, strong.id])
+
+        assert deleted == [weak.id]
+        assert await semantic_store.get_rule(weak.id) is None
+        assert (await semantic_store.get_rule(strong.id)).contradictions == 1
+        assert [r.id for r in await semantic_store.select_rules("weak strong")] == [strong.id]
+
+    async def test_select_rules_returns_decayed_confidence(self, db):
+        store = SemanticStore(db, half_life_days=10)
+        stale = SemanticRule(
+            rule="Archive old newsletters", confidence=0.8,
+            last_validated=datetime.utcnow() - timedelta(days=10),
+        )
+        await store.add_rule(stale)
+
+        selected = await store.select_rules("newsletters")
+        assert selected[0].confidence == pytest.approx(0.4, abs=0.01)
+        # Stored confidence is untouched
+        assert (await store.get_rule(stale.id)).confidence == 0.8
+
+    async def test_evict_rules_enforces_domain_cap(self, db):
+        store = SemanticStore(db, half_life_days=10, max_rules_per_domain=2)
+        now = datetime.utcnow()
+        fresh = SemanticRule(rule="fresh rule", confidence=0.6, last_validated=now)
+        strong = SemanticRule(rule="strong rule", confidence=0.9, last_validated=now - timedelta(days=5))
+        stale = SemanticRule(rule="stale rule", confidence=0.9, last_validated=now - timedelta(days=60))
+        other = SemanticRule(rule="other domain rule", confidence=0.1, domain="email")
+        await store.add_rules([fresh, strong, stale, other])
+
+        evicted = await store.evict_rules()
+
+        assert evicted == [stale.id]
+        remaining = {r.id for r in await store.get_all_rules()}
+        assert remaining == {fresh.id, strong.id, other.id}
+        assert await store.select_rules("stale rule") != []
+        assert stale.id not in {r.id for r in await store.select_rules("stale rule")}
+
+    async def test_evict_rules_under_cap_is_noop(self, semantic_store):
+        await semantic_store.add_rule(SemanticRule(rule="only rule", confidence=0.1))
+        assert await semantic_store.evict_rules() == []
+        assert await semantic_store.count_rules() == 1
+
+
+# ---------------------------------------------------------------------------
+# RuleIndex
+# ---------------------------------------------------------------------------
+
+class TestRuleIndex:
+    def test_empty_index(self):
+        assert RuleIndex().search("anything") == []
+
+    def test_no_matching_terms(self):
+        index = RuleIndex()
+        index.add(SemanticRule(rule="Use the calculate tool for arithmetic", confidence=0.9))
+        assert index.search("tell me a joke") == []
+
+    def test_top_k_limit(self):
+        index = RuleIndex()
+        for i in range(20):
+            index.add(SemanticRule(rule=f"Email rule number {i} about inbox triage", confidence=0.7))
+        assert len(index.search("triage my inbox", limit=5)) == 5
+
+    def test_confidence_breaks_ties(self):
+        index = RuleIndex()
+        low = SemanticRule(rule="Summarize long emails", confidence=0.5)
+        high = SemanticRule(rule="Summarize long emails first", confidence=0.9)
+        index.add(low)
+        index.add(high)
+        assert index.search("summarize emails")[0].id == high.id
+
+    def test_domain_boost(self):
+        index = RuleIndex(domain_boost=3.0)
+        general = SemanticRule(rule="Round results to two decimals", confidence=0.8)
+        math = SemanticRule(rule="Round results to two decimals", confidence=0.8, domain="math")
+        index.add(general)
+        index.add(math)
+        assert index.search("math: round these results")[0].id == math.id
+
+    def test_shared_vocabulary(self):
+        index = RuleIndex()
+        rules = [SemanticRule(rule=f"When the user asks about topic{i}, answer briefly", confidence=0.8)
+                 for i in range(200)]
+        for rule in rules:
+            index.add(rule)
+        # "user" and "asks" are in every rule: the specific term picks the rule
+        assert [r.id for r in index.search("the user asks about topic42")] == [rules[42].id]
+        # ...and with no specific term, the shared terms alone still rank rules
+        assert len(index.search("what the user asks", limit=5)) == 5
+
+    def test_token_budget(self):
+        index = RuleIndex()
+        long_rule = SemanticRule(rule="Calendar " + "very " * 200 + "long rule", confidence=0.99)
+        short_rule = SemanticRule(rule="Calendar invites need a timezone", confidence=0.5)
+        index.add(long_rule)
+        index.add(short_rule)
+
+        selected = index.search("calendar", limit=5, token_budget=50)
+        assert [r.id for r in selected] == [short_rule.id]
+
+    def test_remove(self):
+        index = RuleIndex()
+        rule = SemanticRule(rule="Backups run nightly", confidence=0.8)
+        index.add(rule)
+        index.remove(rule.id)
+        assert rule.id not in index
+        assert index.search("backups") == []
+
+    def test_find_duplicate_ignores_case_and_punctuation(self):
+        index = RuleIndex()
+        rule = SemanticRule(rule="Reply in English, unless asked otherwise.", confidence=0.8)
+        index.add(rule)
+        candidate = SemanticRule(rule="reply in english unless asked otherwise", confidence=0.6)
+        assert index.find_duplicate(candidate).id == rule.id
+
+    def test_find_duplicate_below_threshold(self):
+        index = RuleIndex()
+        index.add(SemanticRule(rule="Reply in English unless asked otherwise", confidence=0.8))
+        candidate = SemanticRule(rule="Reply in French when the user writes French", confidence=0.8)
+        assert index.find_duplicate(candidate) is None
+
+    def test_find_duplicate_requires_same_polarity(self):
+        index = RuleIndex()
+        rule = SemanticRule(rule="Always ask before deleting files in the shared folder", confidence=0.8)
+        index.add(rule)
+        never = SemanticRule(rule="Never ask before deleting files in the shared folder", confidence=0.8)
+        assert index.find_duplicate(never) is None
+        again = SemanticRule(rule="Always ask before deleting any files in the shared folder", confidence=0.8)
+        assert index.find_duplicate(again).id == rule.id
+
+    def test_decayed_confidence(self):
+        now = datetime.utcnow()
+        rule = SemanticRule(rule="r", confidence=0.8, last_validated=now - timedelta(days=60))
+        assert decayed_confidence(rule, half_life_days=30, now=now) == pytest.approx(0.2)
+        assert decayed_confidence(rule, half_life_days=0, now=now) == 0.8
+
+    def test_decay_demotes_stale_rules(self):
+        index = RuleIndex(half_life_days=7)
+        stale = SemanticRule(
+            rule="Ping the backup server", confidence=0.9,
+            last_validated=datetime.utcnow() - timedelta(days=30),
+        )
+        fresh = SemanticRule(rule="Ping the backup server daily", confidence=0.6)
+        index.add(stale)
+        index.add(fresh)
+        assert index.search("ping backup server")[0].id == fresh.id
+
+    def test_update_confidence_reranks(self):
+        index = RuleIndex()
+        a = SemanticRule(rule="Restart the service", confidence=0.9)
+        b = SemanticRule(rule="Restart the service politely", confidence=0.6)
+        index.add(a)
+        index.add(b)
+        assert index.search("restart service")[0].id == a.id
+
+        index.update(a.model_copy(update={"confidence": 0.1}))
+        assert index.search("restart service")[0].id == b.id
+
+    def test_decay_only_update_skips_reindexing(self):
+        index = RuleIndex(half_life_days=7)
+        old = datetime.utcnow() - timedelta(days=30)
+        a = SemanticRule(rule="Restart the service", confidence=0.9)
+        b = SemanticRule(rule="Restart the service politely", confidence=0.6, last_validated=old)
+        zero = SemanticRule(rule="Restart the service now", confidence=0.0)
+        for rule in (a, b, zero):
+            index.add(rule)
+
+        with patch("romulus.chronicle.rule_index.tokenize", side_effect=AssertionError("reindexed")):
+            index.update(a.model_copy(update={"last_validated": old}))
+            index.update(b.model_copy(update={"last_validated": datetime.utcnow()}))
+        assert [r.id for r in index.search("restart service")] == [b.id, a.id, zero.id]
+
+    def test_incremental_mutations_match_a_fresh_index(self):
+        rng = random.Random(5)
+        words = ["backup", "server", "email", "inbox", "math", "round", "timezone", "calendar", "reply", "joke"]
+        rules = [
+            SemanticRule(rule=" ".join(rng.choices(words, k=rng.randint(2, 8))), confidence=rng.random())
+            for _ in range(60)
+        ]
+        index = RuleIndex()
+        queries = [" ".join(rng.sample(words, 3)) for _ in range(20)]
+        for rule in rules:
+            index.add(rule)
+            index.search(queries[0])
+        for rule in rules[::3]:
+            index.remove(rule.id)
+
+        fresh = RuleIndex()
+        for rule in rules:
+            if rule.id in index:
+                fresh.add(rule)
+        for query in queries:
+            assert [r.id for r in index.search(query)] == [r.id for r in fresh.search(query)]
+
+
 # ---------------------------------------------------------------------------
 # IdentityStore
 # ---------------------------------------------------------------------------
@@ -501,3 +836,36 @@ class TestIdentityStore:
         await identity_store.get_or_create_identity("Test", soul_spec="Be helpful and kind.")
         identity = await identity_store.get_identity()
         assert identity.soul_spec == "Be helpful and kind."
+
+    async def test_get_identity_served_from_cache(self, identity_store, db):
+        await identity_store.get_or_create_identity("Test")
+
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            await identity_store.get_identity()
+            await identity_store.get_identity()
+
+        assert execute.call_count == 0
+
+    async def test_update_stats_is_single_query(self, identity_store, db):
+        await identity_store.get_or_create_identity("Test")
+
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            await identity_store.update_stats(task_success=True)
+
+        assert execute.call_count == 1
+
+    async def test_cached_stats_match_database(self, identity_store, db):
+        await identity_store.get_or_create_identity("Test")
+        for i in range(23):
+            await identity_store.update_stats(task_success=(i % 3 != 0))
+
+        cached = await identity_store.get_identity()
+        persisted = await IdentityStore(db).get_identity()
+        assert persisted.total_tasks == cached.total_tasks == 23
+        assert persisted.successful_tasks == cached.successful_tasks == 15
+        assert persisted.trust_score == cached.trust_score == trust_score(23, 15)
+
+    async def test_returned_identity_is_a_copy(self, identity_store):
+        identity = await identity_store.get_or_create_identity("Test")
+        identity.total_tasks = 999
+        assert (await identity_store.get_identity()).total_tasks == 0
@@ -0,0 +1,151 @@
+"""Tests for OllamaClient against a mocked Ollama HTTP API."""
+
+import json
+
+import httpx
+import pytest
+
+from romulus.llm.client import OllamaClient
+from romulus.llm.jsonstream import JSONObjectScanner
+
+
+def ndjson(*objects: dict) -> bytes:
+    return "".join(json.dumps(o) + "\n" for o in objects).encode()
+
+
+FINAL = {"done": True, "eval_count": 40, "prompt_eval_count": 10, "eval_duration": 2_000_000_000}
+
+
+def mock_client(handler) -> OllamaClient:
+    client = OllamaClient()
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+# ---------------------------------------------------------------------------
+# Non-streaming
+# ---------------------------------------------------------------------------
+
+class TestGenerate:
+    async def test_generate_reports_usage_and_rate(self):
+        def handler(request):
+            assert json.loads(request.content)["stream"] is False
+            return httpx.Response(200, json={"response": " Hello ", **FINAL})
+
+        client = mock_client(handler)
+        response = await client.generate("hi")
+        assert response.text == "Hello"
+        assert response.tokens_used == 50
+        assert response.tokens_per_second == 20.0
+        assert response.ttft_ms is None
+        await client.close()
+
+    async def test_chat_without_durations(self):
+        def handler(request):
+            return httpx.Response(200, json={"message": {"content": "Hi"}, "done": True})
+
+        client = mock_client(handler)
+        response = await client.chat([{"role": "user", "content": "hi"}])
+        assert response.text == "Hi"
+        assert response.tokens_used == 0
+        assert response.tokens_per_second is None
+        await client.close()
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+class TestStreaming:
+    async def test_generate_stream_yields_deltas_then_usage(self):
+        def handler(request):
+            body = json.loads(request.content)
+            assert request.url.path == "/api/generate"
+            assert body["stream"] is True
+            assert body["system"] == "be brief"
+            return httpx.Response(200, content=ndjson(
+                {"response": "Hel", "done": False},
+                {"response": "lo", "done": False},
+                {"response": "", **FINAL},
+            ))
+
+        client = mock_client(handler)
+        chunks = [c async for c in client.generate_stream("hi", system="be brief")]
+        assert [c.text for c in chunks[:-1]] == ["Hel", "lo"]
+        final = chunks[-1]
+        assert final.done and final.text == ""
+        assert final.response.text == "Hello"
+        assert final.response.tokens_used == 50
+        assert final.response.tokens_per_second == 20.0
+        assert 0 <= final.response.ttft_ms <= final.response.latency_ms
+        await client.close()
+
+    async def test_chat_stream(self):
+        def handler(request):
+            assert request.url.path == "/api/chat"
+            return httpx.Response(200, content=ndjson(
+                {"message": {"role": "assistant", "content": "{\"a\":"}, "done": False},
+                {},
+                {"message": {"role": "assistant", "content": " 1}"}, "done": False},
+                {"message": {"role": "assistant", "content": ""}, **FINAL},
+            ))
+
+        client = mock_client(handler)
+        chunks = [c async for c in client.chat_stream([{"role": "user", "content": "hi"}])]
+        assert "".join(c.text for c in chunks) == '{"a": 1}'
+        assert chunks[-1].response.text == '{"a": 1}'
+        await client.close()
+
+    async def test_stream_error_record_raises(self):
+        client = mock_client(lambda request: httpx.Response(200, content=ndjson({"error": "model not found"})))
+        with pytest.raises(RuntimeError, match="model not found"):
+            [c async for c in client.generate_stream("hi")]
+        await client.close()
+
+    async def test_truncated_stream_raises(self):
+        client = mock_client(lambda request: httpx.Response(200, content=ndjson({"response": "Hel", "done": False})))
+        with pytest.raises(RuntimeError, match="without a final record"):
+            [c async for c in client.generate_stream("hi")]
+        await client.close()
+
+    async def test_http_error_raises(self):
+        client = mock_client(lambda request: httpx.Response(500))
+        with pytest.raises(httpx.HTTPStatusError):
+            [c async for c in client.chat_stream([])]
+        await client.close()
+
+
+# ---------------------------------------------------------------------------
+# JSONObjectScanner
+# ---------------------------------------------------------------------------
+
+def scan(*deltas: str) -> tuple[str | None, int]:
+    """The object found and how many deltas were fed to find it."""
+    scanner = JSONObjectScanner()
+    for i, delta in enumerate(deltas, 1):
+        found = scanner.feed(delta)
+        if found is not None:
+            return found, i
+    return None, len(deltas)
+
+
+class TestJSONObjectScanner:
+    def test_object_found_at_closing_brace(self):
+        obj, fed = scan('{"action": ', '"respond"', ', "params": {"a": 1}', "}", " Hope that helps!", " More")
+        assert obj == '{"action": "respond", "params": {"a": 1}}'
+        assert fed == 4
+
+    def test_preamble_and_fence_skipped(self):
+        obj, _ = scan("Sure! ```json\n", '{"a": 1}', "\n```")
+        assert json.loads(obj) == {"a": 1}
+
+    def test_braces_and_quotes_in_strings_ignored(self):
+        text = '{"response": "use {x} and \\"}\\" here", "b": "\\\\"}'
+        obj, _ = scan(*text)
+        assert obj == text
+        assert json.loads(obj)["b"] == "\\"
+
+    def test_incomplete_object(self):
+        scanner = JSONObjectScanner()
+        assert scanner.feed('{"a": {"b": 1}') is None
+        assert scanner.text == '{"a": {"b": 1}'
@@ -255,6 +255,7 @@ class TestThreatCategory:
         expected = {
             "destructive", "looping", "hallucination",
             "scope_escape", "cost_runaway", "confidence_anomaly", "cascade_risk",
+            "unverified",
         }
         actual = {member.value for member in ThreatCategory}
         assert actual == expected
@@ -21,15 +21,19 @@ from romulus.chronicle.database import ChronicleDB
 from romulus.chronicle.episodic import EpisodicStore
 from romulus.chronicle.identity import IdentityStore
 from romulus.chronicle.semantic import SemanticStore
+from romulus.config import VigilConfig
 from romulus.dream.engine import DreamEngine
-from romulus.llm.client import LLMResponse, OllamaClient
+from romulus.llm.client import LLMResponse, OllamaClient, StreamChunk
 from romulus.models.actions import AgentAction
 from romulus.models.episodic import EpisodicTrace
 from romulus.models.semantic import SemanticRule
 from romulus.models.vigil import ThreatCategory, VigilVerdict
 from romulus.vigil.adaptive import AdaptiveLayer
+from romulus.vigil.anomaly import AnomalyDetector
 from romulus.vigil.incidents import IncidentLogger
 from romulus.vigil.innate import InnateLayer
+from romulus.vigil.judge import JudgeLayer
+from romulus.vigil.limits import RateLimiter
 from romulus.vigil.sentinel import Sentinel
 
 
@@ -211,6 +215,21 @@ class TestCriterion1Boot:
         assert result.success is True
         assert "Tool: get_time" in result.response
 
+    async def test_agent_prompt_includes_only_relevant_rules(self, agent_with_mock_llm):
+        agent, infra = agent_with_mock_llm
+        await infra["semantic_store"].add_rule(
+            SemanticRule(rule="When asked about math, use the calculate tool", confidence=0.9)
+        )
+        await infra["semantic_store"].add_rule(
+            SemanticRule(rule="When greeting the user, mention the weather", confidence=0.9)
+        )
+
+        await agent.handle_task("Help me with some math homework")
+
+        system_prompt = agent.llm.chat.call_args.args[0][0]["content"]
+        assert "calculate tool" in system_prompt
+        assert "weather" not in system_prompt
+
     async def test_agent_handles_llm_error(self, infra):
         """Agent should handle LLM errors gracefully."""
         mock_llm = AsyncMock(spec=OllamaClient)
@@ -230,6 +249,137 @@ class TestCriterion1Boot:
         assert result.success is False
         assert "LLM error" in result.response
 
+    async def test_agent_token_budget_enforced(self, infra):
+        """Tokens spent on one task count against the agent's budget for the next."""
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        sentinel = Sentinel(
+            infra["sentinel"].innate, infra["sentinel"].adaptive, infra["incident_logger"],
+            RateLimiter(max_tokens_per_minute=100),
+        )
+        agent = AgentCore(
+            llm=make_mock_llm('{"thought": "hi", "action": "respond", "response": "Hello!"}', tokens=150),
+            episodic_store=infra["episodic_store"],
+            semantic_store=infra["semantic_store"],
+            identity_store=infra["identity_store"],
+            sentinel=sentinel,
+            tools=infra["tools"],
+        )
+
+        assert (await agent.handle_task("hello")).success
+        result = await agent.handle_task("hello again")
+        assert result.success is False
+        assert "token budget" in result.vigil_flags[0]
+
+    async def test_agent_flags_response_anomalies(self, infra):
+        """Unknown tools and out-of-line confidence are flagged without failing the task."""
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        sentinel = Sentinel(
+            infra["sentinel"].innate, infra["sentinel"].adaptive, infra["incident_logger"],
+            anomaly=AnomalyDetector(warmup=3),
+        )
+        replies = [
+            {"thought": "t", "action": "respond", "response": "Sure.", "confidence": 0.9},
+            {"thought": "t", "action": "respond", "response": "Sure.", "confidence": 0.9},
+            {"thought": "t", "action": "respond", "response": "Sure.", "confidence": 0.9},
+            {"thought": "t", "action": "respond", "response": "Maybe?", "confidence": 0.1},
+            {"thought": "t", "action": "launch_rocket", "response": "Launched.", "confidence": 0.9},
+        ]
+        llm = make_mock_llm()
+        llm.chat.side_effect = [
+            LLMResponse(text=json.dumps(r), tokens_used=50, latency_ms=100, model="mock") for r in replies
+        ]
+        agent = AgentCore(
+            llm=llm,
+            episodic_store=infra["episodic_store"],
+            semantic_store=infra["semantic_store"],
+            identity_store=infra["identity_store"],
+            sentinel=sentinel,
+            tools=infra["tools"],
+        )
+
+        results = [await agent.handle_task(f"question {i}") for i in range(5)]
+        assert all(r.success for r in results)
+        assert [r.vigil_flags for r in results[:3]] == [[], [], []]
+        assert "confidence" in results[3].vigil_flags[0]
+        assert "launch_rocket" in results[4].vigil_flags[0]
+
+        rows = await infra["db"].execute("SELECT category FROM vigil_incidents ORDER BY timestamp")
+        assert [r["category"] for r in rows] == ["confidence_anomaly", "hallucination"]
+
+
+class FakeStreamingLLM:
+    """Streams a reply one delta at a time, recording how much was consumed."""
+
+    model = "mock"
+
+    def __init__(self, deltas: list[str]):
+        self.deltas = deltas
+        self.sent = 0
+        self.closed = False
+
+    async def chat_stream(self, messages, temperature=0.7, max_tokens=512):
+        try:
+            for delta in self.deltas:
+                self.sent += 1
+                yield StreamChunk(text=delta)
+            yield StreamChunk(done=True, response=LLMResponse(
+                text="".join(self.deltas), tokens_used=300, latency_ms=50, model="mock",
+            ))
+        finally:
+            self.closed = True
+
+
+class TestStreamedResponses:
+    REPLY = ['{"thought": "t", ', '"action": "calculate", ', '"params": {"expression": "6 * 7"}, ',
+             '"response": "It is {42}.", ', '"confidence": 0.9}']
+
+    def agent(self, infra, llm) -> AgentCore:
+        return AgentCore(
+            llm=llm,
+            episodic_store=infra["episodic_store"],
+            semantic_store=infra["semantic_store"],
+            identity_store=infra["identity_store"],
+            sentinel=infra["sentinel"],
+            tools=infra["tools"],
+            stream_responses=True,
+        )
+
+    async def test_generation_stops_at_closing_brace(self, infra):
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        llm = FakeStreamingLLM(self.REPLY + ["\n\nLet me know"] + [" if you need more."] * 100)
+        agent = self.agent(infra, llm)
+
+        result = await agent.handle_task("what is 6 * 7?")
+        assert result.success
+        assert "[Tool: calculate] 42" in result.response
+        assert llm.sent == len(self.REPLY)
+        assert llm.closed
+        assert result.tokens_saved == AgentCore.MAX_RESPONSE_TOKENS - len(self.REPLY)
+        assert result.latency_saved_ms >= 0
+        assert result.tokens_used > len(self.REPLY)
+        assert agent.stream_stats()["early_stops"] == 1
+        assert agent.stream_stats()["tokens_saved"] == result.tokens_saved
+
+    async def test_natural_end_reports_no_savings(self, infra):
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        llm = FakeStreamingLLM(["Just ", "plain ", "text."])
+        agent = self.agent(infra, llm)
+
+        result = await agent.handle_task("hello")
+        assert result.response == "Just plain text."
+        assert result.tokens_used == 300
+        assert (result.tokens_saved, result.latency_saved_ms) == (0, 0)
+        assert agent.stream_stats()["early_stops"] == 0
+
+    async def test_invalid_object_streams_to_the_end(self, infra):
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        llm = FakeStreamingLLM(["{not json} ", "then ", '{"response": "ok", "action": "respond"}'])
+        agent = self.agent(infra, llm)
+
+        result = await agent.handle_task("hello")
+        assert llm.sent == 3
+        assert result.tokens_saved == 0
+
 
 # ---------------------------------------------------------------------------
 # CRITERION 2: Dream Engine runs and produces reports
@@ -458,6 +608,46 @@ class TestCriterion4VigilCatch:
 
         assert blocked >= 4, f"Only {blocked}/5 blocked through agent"
 
+    async def test_judge_reviews_tool_arguments_through_agent(self, infra):
+        """Tool calls with arguments reach the judge; argument-free ones and the task don't."""
+        await infra["identity_store"].get_or_create_identity("Romulus-Test")
+        sentinel = Sentinel(
+            infra["sentinel"].innate, infra["sentinel"].adaptive, infra["incident_logger"],
+            judge=JudgeLayer(make_mock_llm(), action_types=tuple(VigilConfig().judge_action_types)),
+        )
+        replies = [
+            {"thought": "t", "action": "get_time", "params": {}, "response": "", "confidence": 0.9},
+            {"thought": "t", "action": "calculate", "params": {"expression": "2**99999999"}, "response": "",
+             "confidence": 0.9},
+        ]
+        llm = make_mock_llm()
+        llm.chat.side_effect = [
+            LLMResponse(text=json.dumps(r), tokens_used=50, latency_ms=100, model="mock") for r in replies
+        ]
+        sentinel.judge.llm.generate.return_value = LLMResponse(
+            text='{"safe": false, "reason": "exhausts memory", "risk_level": "critical"}',
+            tokens_used=10, latency_ms=1, model="mock",
+        )
+        agent = AgentCore(
+            llm=llm,
+            episodic_store=infra["episodic_store"],
+            semantic_store=infra["semantic_store"],
+            identity_store=infra["identity_store"],
+            sentinel=sentinel,
+            tools=infra["tools"],
+        )
+
+        assert (await agent.handle_task("what time is it")).success
+        assert sentinel.judge.calls == 0
+
+        result = await agent.handle_task("compute a big power")
+        assert sentinel.judge.calls == 1
+        assert not result.success
+        assert "exhausts memory" in result.vigil_flags[0]
+        # The ruling was about the arguments, so the tool itself isn't learned
+        assert infra["sentinel"].adaptive.memory_stats()["cells"] == 0
+        assert await infra["db"].execute("SELECT * FROM vigil_memory_cells") == []
+
     async def test_scope_violations_caught(self, infra):
         sentinel = infra["sentinel"]
         scope_attacks = [